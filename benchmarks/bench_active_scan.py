@@ -0,0 +1,92 @@
+"""Benchmark: sequential vs. parallel SecurityAuditor.active_scan.
+
+Usage (from repo root):
+    python benchmarks/bench_active_scan.py [--fields 30] [--concurrency 8]
+
+Serves tests/vulnerable_app.html plus a generated variant with `--fields`
+reflecting inputs from a local HTTP server, then scans each page with one
+worker (the original behaviour) and with `--concurrency` workers.
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+import functools
+import shutil
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+sys.path.append(os.getcwd())
+
+from quantum_qe_core.skills.browser import BrowserManager
+from quantum_qe_core.skills.scanner import SecurityAuditor
+
+FIELD_TEMPLATE = """
+    <input type="text" id="field{i}" name="f{i}">
+    <div id="out{i}"></div>
+    <script>
+        document.getElementById('field{i}').addEventListener('keypress', function (e) {{
+            if (e.key === 'Enter') document.getElementById('out{i}').innerHTML = this.value;
+        }});
+    </script>"""
+
+
+def build_many_fields(path: str, fields: int):
+    body = "".join(FIELD_TEMPLATE.format(i=i) for i in range(fields))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html><html><head><title>Many Fields</title></head><body>{body}</body></html>")
+
+
+def serve(directory: str):
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def scan(url: str, concurrency: int):
+    browser = BrowserManager(headless=True)
+    auditor = SecurityAuditor()
+    try:
+        await browser.start()
+        await browser.navigate(url)
+        start = time.perf_counter()
+        await auditor.active_scan(browser, concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+    finally:
+        await browser.close()
+    return elapsed, auditor.get_findings()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Active scan benchmark")
+    parser.add_argument("--fields", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="qe_bench_")
+    shutil.copy(os.path.join("tests", "vulnerable_app.html"), root)
+    build_many_fields(os.path.join(root, "many_fields.html"), args.fields)
+    server = serve(root)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        print(f"{'page':<24}{'workers':>8}{'seconds':>10}{'findings':>10}")
+        for page in ["vulnerable_app.html", "many_fields.html"]:
+            baseline = None
+            for workers in [1, args.concurrency]:
+                elapsed, findings = await scan(f"{base}/{page}", workers)
+                print(f"{page:<24}{workers:>8}{elapsed:>10.2f}{len(findings):>10}")
+                if baseline is None:
+                    baseline = findings
+                elif findings != baseline:
+                    print("  WARNING: parallel findings differ from the sequential run")
+    finally:
+        server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Benchmark: in-page DOM extraction vs. the BeautifulSoup path.
+
+Usage (from repo root):
+    python benchmarks/bench_dom_extraction.py [--iterations 20] [--scale 200]
+
+Each fixture in tests/ is loaded as-is and also inflated `--scale` times to
+approximate the 2-5 MB SPA pages seen in production.
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+sys.path.append(os.getcwd())
+
+from playwright.async_api import async_playwright
+from quantum_qe_core.skills.dom_extractor import DomExtractor, simplify_html
+
+FIXTURES_DIR = Path("tests")
+
+
+async def time_call(fn, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def inflate(html: str, scale: int) -> str:
+    """Repeats the body `scale` times, nested in wrappers to exercise deep containers."""
+    lower = html.lower()
+    start, end = lower.find("<body"), lower.rfind("</body>")
+    if start == -1 or end == -1:
+        return html
+    start = lower.find(">", start) + 1
+    body = html[start:end]
+    inner = "".join(f"<div class='wrap' id='w{i}'>{body}</div>" for i in range(scale))
+    return html[:start] + inner + html[end:]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="DOM extraction benchmark")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=200)
+    args = parser.parse_args()
+
+    extractor = DomExtractor()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+
+        print(f"{'fixture':<28}{'size KB':>10}{'elements':>10}{'bs4 ms':>10}{'in-page ms':>12}{'speedup':>9}")
+        for fixture in sorted(FIXTURES_DIR.glob("*.html")):
+            html = fixture.read_text(encoding="utf-8")
+            for label, content in [(fixture.name, html), (f"{fixture.name} x{args.scale}", inflate(html, args.scale))]:
+                await page.set_content(content)
+
+                async def legacy():
+                    simplify_html(await page.content())
+
+                async def in_page():
+                    await extractor.extract(page)
+
+                legacy_ms = await time_call(legacy, args.iterations)
+                in_page_ms = await time_call(in_page, args.iterations)
+                count = len((await extractor.extract(page))["elements"])
+                size_kb = len(content.encode("utf-8")) / 1024
+                print(f"{label:<28}{size_kb:>10.1f}{count:>10}{legacy_ms:>10.1f}{in_page_ms:>12.1f}{legacy_ms / in_page_ms:>8.1f}x")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""Microbenchmark: BM25 KnowledgeIndex vs. the original os.walk + substring grep.
+
+Usage (from repo root):
+    python benchmarks/bench_knowledge_index.py [--docs 10000] [--queries 200]
+
+Generates a synthetic markdown corpus of `--docs` files in a temp directory and
+reports index build time, warm start from the JSON cache, and query latency.
+"""
+import sys
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+sys.path.append(os.getcwd())
+
+from quantum_qe_core.skills.knowledge_index import KnowledgeIndex
+
+VOCABULARY = (
+    "injection xss sql csrf cookie header session token password hash encryption tls certificate "
+    "authentication authorization access control role policy redirect traversal upload deserialization "
+    "logging monitoring configuration default error stack trace api endpoint rate limit cors origin "
+    "sanitize encode validate parameterized query template server client browser storage secret key"
+).split()
+
+
+def build_corpus(root: str, docs: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(docs):
+        sections = []
+        for s in range(rng.randint(2, 5)):
+            words = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(40, 120)))
+            sections.append(f"## Section {s} {rng.choice(VOCABULARY)}\n{words}\n")
+        with open(os.path.join(root, f"doc_{i:05d}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# Document {i}\n" + "\n".join(sections))
+
+
+def grep_search(path: str, query: str) -> list:
+    """The original SearchSecurityStandards implementation."""
+    results = []
+    for root, _, files in os.walk(path):
+        for file in files:
+            if file.endswith(".md"):
+                with open(os.path.join(root, file), "r", encoding="utf-8") as f:
+                    content = f.read()
+                    if query.lower() in content.lower():
+                        idx = content.lower().find(query.lower())
+                        results.append(content[max(0, idx - 100):idx + 400])
+    return results
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge index microbenchmark")
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--grep-queries", type=int, default=5, help="The grep baseline is slow; sample fewer")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="qe_kb_")
+    cache = os.path.join(root, "cache", "index.json")
+    corpus = os.path.join(root, "corpus")
+    os.makedirs(corpus)
+    try:
+        start = time.perf_counter()
+        build_corpus(corpus, args.docs)
+        print(f"Generated {args.docs} documents in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        index = KnowledgeIndex(corpus, cache_path=cache)
+        index.refresh(force=True)
+        print(f"Cold build: {time.perf_counter() - start:.2f}s ({len(index.chunks)} chunks, {len(index.postings)} terms)")
+
+        start = time.perf_counter()
+        warm = KnowledgeIndex(corpus, cache_path=cache)
+        warm.refresh(force=True)
+        print(f"Warm start from cache: {time.perf_counter() - start:.2f}s")
+
+        rng = random.Random(11)
+        queries = [" ".join(rng.sample(VOCABULARY, rng.randint(1, 3))) for _ in range(args.queries)]
+
+        samples = []
+        for q in queries:
+            t = time.perf_counter()
+            warm.search(q)
+            samples.append(time.perf_counter() - t)
+        p50, p95 = percentiles(samples)
+        print(f"BM25 search: p50 {p50:.2f} ms, p95 {p95:.2f} ms over {len(queries)} queries")
+
+        samples = []
+        for q in queries[:args.grep_queries]:
+            t = time.perf_counter()
+            grep_search(corpus, q)
+            samples.append(time.perf_counter() - t)
+        p50, p95 = percentiles(samples)
+        print(f"grep baseline: p50 {p50:.2f} ms, p95 {p95:.2f} ms over {len(samples)} queries")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
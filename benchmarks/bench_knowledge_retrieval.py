@@ -0,0 +1,93 @@
+"""Recall/latency benchmark for SearchSecurityStandards retrieval.
+
+Usage (from repo root):
+    python benchmarks/bench_knowledge_retrieval.py [--repeat 50]
+
+Runs labeled natural-language queries against quantum_qe_core/knowledge with
+the original substring grep, BM25, the character n-gram vectors and the fused
+ranking used by KnowledgeManager. A query counts as recalled when the
+expected OWASP section is among the top 3 results.
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+sys.path.append(os.getcwd())
+
+from quantum_qe_core.skills.knowledge import KnowledgeManager
+
+KNOWLEDGE_PATH = os.path.join("quantum_qe_core", "knowledge")
+
+# (query, expected section id)
+LABELED_QUERIES = [
+    ("SQL Injection", "A03"),
+    ("script injection in search box", "A03"),
+    ("cross site scripting in comments", "A03"),
+    ("parameterized queries", "A03"),
+    ("user can open another user's invoice", "A01"),
+    ("role based access checks", "A01"),
+    ("passwords stored with weak hashing", "A02"),
+    ("data sent without TLS", "A02"),
+    ("missing security headers like HSTS", "A05"),
+    ("verbose error messages with stack traces", "A05"),
+    ("default configuration left enabled", "A05"),
+    ("session cookie missing secure flag", "A07"),
+    ("no multi-factor authentication", "A07"),
+    ("threat modeling during design", "A04"),
+]
+
+
+def grep_top(query: str, k: int = 3) -> list:
+    """The original tool's substring match, credited with the section the match falls in."""
+    results = []
+    for root, _, files in os.walk(KNOWLEDGE_PATH):
+        for file in files:
+            if file.endswith(".md"):
+                with open(os.path.join(root, file), "r", encoding="utf-8") as f:
+                    content = f.read()
+                idx = content.lower().find(query.lower())
+                if idx != -1:
+                    heading = content.rfind("\n#", 0, idx)
+                    results.append(content[heading:content.find("\n", heading + 1)])
+    return results[:k]
+
+
+def evaluate(name, search, repeat):
+    hits, samples = 0, []
+    for query, expected in LABELED_QUERIES:
+        results = search(query)
+        hits += any(expected in r for r in results)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search(query)
+            samples.append(time.perf_counter() - start)
+    print(f"{name:<18}{hits:>4}/{len(LABELED_QUERIES):<4}{hits / len(LABELED_QUERIES):>9.0%}{statistics.median(samples) * 1e6:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge retrieval recall/latency benchmark")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    knowledge = KnowledgeManager(KNOWLEDGE_PATH, index_cache=None)
+    knowledge.warm()
+
+    def titles(hits):
+        return [h["title"] for h in hits]
+
+    print(f"{'retriever':<18}{'recall@3':>9}{'':>8}{'p50 us':>14}")
+    evaluate("grep (original)", grep_top, args.repeat)
+    evaluate("bm25", lambda q: titles(knowledge.index.search(q)), args.repeat)
+
+    def uncached(q):
+        knowledge.vectors._cache.clear()
+        return titles(knowledge.vectors.search(q))
+
+    evaluate("ngram vectors", uncached, args.repeat)
+    evaluate("ngram (cached)", lambda q: titles(knowledge.vectors.search(q)), args.repeat)
+    evaluate("fused (tool)", lambda q: titles(knowledge.search(q)), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Local stand-in server for exercising the HTTP fuzzer.
+
+Serves tests/vulnerable_app.html. When a `q` parameter is present it is written,
+unescaped, into `<div id="results">` on the server side (the same sink the page
+uses client-side), and a quote in `q` yields a SQL error message.
+
+Usage (from repo root):
+    python benchmarks/standin_server.py            # fuzz it over HTTP and via the browser
+    python benchmarks/standin_server.py --serve    # just serve on --port
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+sys.path.append(os.getcwd())
+
+FIXTURE = os.path.join("tests", "vulnerable_app.html")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path not in ("/", "/vulnerable_app.html"):
+            self.send_error(404)
+            return
+        with open(FIXTURE, encoding="utf-8") as f:
+            html = f.read()
+        query = parse_qs(parts.query).get("q", [""])[0]
+        if query:
+            # VULNERABILITY (intentional): reflected without escaping
+            html = html.replace('<div id="results"></div>', f'<div id="results">You searched for: {query}</div>')
+            if "'" in query:
+                html = html.replace("</body>", "<pre>SQLite error: unrecognized token near \"'\"</pre></body>")
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Set-Cookie", "session_id=123456; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_standin_server(port: int = 0) -> ThreadingHTTPServer:
+    """Starts the server on a background thread and returns it."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def demo(url: str):
+    from quantum_qe_core.skills.browser import BrowserManager
+    from quantum_qe_core.skills.scanner import SecurityAuditor
+
+    browser = BrowserManager(headless=True)
+    try:
+        await browser.start()
+        await browser.navigate(url)
+        for mode in ["http", "browser"]:
+            auditor = SecurityAuditor()
+            start = time.perf_counter()
+            if mode == "http":
+                await auditor.http_scan(browser)
+            else:
+                await auditor.active_scan(browser)
+            elapsed = time.perf_counter() - start
+            print(f"\n[{mode}] {elapsed:.2f}s, {len(auditor.get_findings())} findings")
+            for f in auditor.get_findings():
+                print(f"- [{f['severity']}] {f['type']}: {f['details']}")
+    finally:
+        await browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in server for tests/vulnerable_app.html")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--serve", action="store_true", help="Serve only, do not run the fuzzers")
+    args = parser.parse_args()
+
+    server = start_standin_server(args.port)
+    url = f"http://127.0.0.1:{server.server_address[1]}/vulnerable_app.html"
+    if args.serve:
+        print(f"Serving {url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(demo(url))
+    server.shutdown()
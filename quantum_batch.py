@@ -0,0 +1,61 @@
+import os
+import asyncio
+import argparse
+from dotenv import load_dotenv
+
+# Enterprise Core Imports
+from quantum_qe_core.skills.browser_pool import BrowserPool
+from quantum_qe_core.skills.knowledge import KnowledgeManager
+from quantum_qe_core.batch import BatchRunner, load_scenarios, write_summary
+from quantum_qe_core.sharding import ShardedExecutor
+
+# Load environment variables
+load_dotenv()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Quantum QE Core - run a scenario file, resumably")
+    parser.add_argument("scenarios", type=str, help="Scenario file (.yaml/.yml or .jsonl)")
+    parser.add_argument("--out", type=str, default="output/batch", help="Output directory (checkpoint, reports, summary)")
+    parser.add_argument("--headless", action="store_true", help="Run headless")
+    parser.add_argument("--concurrency", type=int, default=3, help="Scenarios run at the same time (per process)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Shard the suite over N worker processes (0 = one per CPU core)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Default per-scenario timeout in seconds")
+    parser.add_argument("--retry-failed", action="store_true", help="Also rerun scenarios checkpointed as error/timeout")
+    args = parser.parse_args()
+
+    scenarios = load_scenarios(args.scenarios)
+
+    if not os.getenv("OPENAI_API_KEY") and os.getenv("QE_LLM_MODE", "live").lower() != "replay":
+        print("Error: OPENAI_API_KEY is missing.")
+        return
+
+    if args.processes != 1:
+        # Each shard process runs its own BatchRunner, browser and event loop
+        executor = ShardedExecutor(args.processes or None, args.out, concurrency=args.concurrency,
+                                   timeout=args.timeout, headless=args.headless, retry_failed=args.retry_failed)
+        results = await asyncio.to_thread(executor.run, scenarios)
+    else:
+        pool = BrowserPool(headless=args.headless, max_contexts=args.concurrency)
+        knowledge = KnowledgeManager("quantum_qe_core/knowledge")
+        knowledge.warm()
+        runner = BatchRunner(pool, knowledge, args.out, concurrency=args.concurrency, timeout=args.timeout,
+                             retry_failed=args.retry_failed)
+
+        try:
+            await pool.start()
+            results = await runner.run(scenarios)
+        finally:
+            await pool.close()
+
+    outputs = write_summary(results, args.out)
+    print("\n--- Batch Summary ---")
+    for result in results:
+        print(f"[{result['id']}] {result['status'].upper():<9} {result.get('duration', 0):>7.1f}s  {result.get('url')}")
+    print(f"Summary: {outputs['summary']}\nAggregate report: {outputs['report']}")
+    print("Quantum Core Shutdown.")
+
+if __name__ == "__main__":
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    asyncio.run(main())
@@ -7,8 +7,9 @@ from dotenv import load_dotenv
 from quantum_qe_core.skills.browser import BrowserManager
 from quantum_qe_core.skills.reporter import TestReporter
 from quantum_qe_core.skills.knowledge import KnowledgeManager
-from quantum_qe_core.agents.navigator import NavigatorAgent
-from quantum_qe_core.agents.auditor import AuditorAgent
+from quantum_qe_core.orchestrator import run_session, skips_security, DEFAULT_INSTRUCTIONS
+from quantum_qe_core.agents.llm_cache import cache_stats
+from quantum_qe_core.tracing import TRACER
 
 # Load environment variables
 load_dotenv()
@@ -32,17 +33,25 @@ if sys.platform.startswith("win"):
 async def main():
     parser = argparse.ArgumentParser(description="Quantum QE Core (Enterprise Architecture)")
     parser.add_argument("--url", type=str, help="Target URL", default=None)
-    parser.add_argument("--instructions", type=str, help="Functional Test Instructions", default="Login as admin/password and search for XSS payload.")
+    parser.add_argument("--instructions", type=str, help="Functional Test Instructions", default=DEFAULT_INSTRUCTIONS)
     parser.add_argument("--headless", action="store_true", help="Run headless")
     parser.add_argument("--skip-security", action="store_true", help="Skip the security audit phase")
+    parser.add_argument("--crawl", type=int, default=0, help="Crawl up to N pages from where the Navigator stopped and scan each")
+    parser.add_argument("--crawl-active", choices=["http", "browser"], default=None, help="Also fuzz forms found while crawling")
+    parser.add_argument("--overlap-audit", action="store_true",
+                        help="Audit each page state in its own context while the Navigator keeps going")
+    parser.add_argument("--fast-audit", action="store_true",
+                        help="Run the scanners directly (no LLM tool loop); the LLM only writes the summary")
+    parser.add_argument("--no-summary", action="store_true", help="With --fast-audit, skip the LLM summary too")
+    parser.add_argument("--trace", type=str, help="Chrome trace-event JSON output", default="output/trace.json")
     args = parser.parse_args()
 
     # Heuristic: Check if instructions imply skipping security
-    if "no security" in args.instructions.lower() or "no hagas un check de seguridad" in args.instructions.lower():
+    if skips_security(args.instructions):
         args.skip_security = True
         print("[INFO] detected 'no security' instruction. Skipping Security Phase.")
 
-    if not os.getenv("OPENAI_API_KEY"):
+    if not os.getenv("OPENAI_API_KEY") and os.getenv("QE_LLM_MODE", "live").lower() != "replay":
         print("Error: OPENAI_API_KEY is missing.")
         return
 
@@ -52,41 +61,15 @@ async def main():
     browser = BrowserManager(headless=args.headless)
     reporter = TestReporter("output/quantum_core_report.pdf")
     knowledge = KnowledgeManager("quantum_qe_core/knowledge")
-    
-    # Initialize Agents
-    navigator = NavigatorAgent(browser, reporter)
-    auditor = AuditorAgent(browser, reporter, knowledge)
+    knowledge.warm()
     
     print("Agents Ready: Navigator (UI) & Auditor (AppSec + RAG).")
     
     try:
         await browser.start()
-        
-        # Phase 1: functional Testing (Navigator)
-        print("\n--- Phase 1: Functional Testing (Navigator) ---")
-        if args.url:
-            nav_instruction = f"1. Navigate to {args.url}\n2. {args.instructions}"
-        else:
-            nav_instruction = args.instructions
-            
-        nav_result = await navigator.run(nav_instruction)
-        print(f"Navigator Result: {nav_result}")
-        reporter.add_step(f"Navigator Phase Complete: {nav_result}", "INFO")
-
-        # Phase 2: Security Audit (Auditor)
-        if not args.skip_security:
-            print("\n--- Phase 2: Security Audit (Auditor) ---")
-            # Auditor inherits the current browser state from Navigator
-            current_url = await browser.get_url()
-            print(f"[INFO] Auditing Current URL: {current_url}")
-            
-            audit_instruction = f"Perform a comprehensive security audit on the current page ({current_url}). Check for headers, cookies, and active vulnerabilities. If you find vulnerabilities, verify details with 'SearchSecurityStandards'."
-            audit_result = await auditor.run(audit_instruction)
-            print(f"Auditor Result: {audit_result}")
-            reporter.add_step(f"Auditor Phase Complete (URL: {current_url}): {audit_result}", "INFO")
-        else:
-            print("\n--- Phase 2: Security Audit (Skipped by user request) ---")
-            reporter.add_step("Security Audit Skipped by user request", "INFO")
+        await run_session(browser, reporter, knowledge, args.url, args.instructions, args.skip_security,
+                          crawl_pages=args.crawl, crawl_active=args.crawl_active, overlap_audit=args.overlap_audit,
+                          fast_audit=args.fast_audit, summarize=not args.no_summary)
 
     except Exception as e:
         print(f"Orchestration Error: {e}")
@@ -99,7 +82,18 @@ async def main():
         except Exception as e:
              print(f"Report Generation Failed: {e}")
              
+        for label, stats in browser.get_settle_stats().items():
+            print(f"[METRIC] settle/{label}: {stats['count']} waits, avg {stats['avg_seconds']:.2f}s, "
+                  f"max {stats['max_seconds']:.2f}s, {stats['timeouts']} timeouts")
+        if browser.passive:
+            print(f"[METRIC] passive: {browser.passive.analyzer.stats['responses']} responses analyzed, "
+                  f"{browser.passive.dropped} dropped, {browser.passive.bodies_dropped} bodies skipped (backlog)")
+        for directory, stats in cache_stats().items():
+            print(f"[METRIC] llm cache ({directory}): {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['writes']} writes")
         await browser.close()
+        print(f"\n[METRIC] timeline (trace: {TRACER.export_chrome_trace(args.trace)})")
+        print(TRACER.format_summary())
         print("Quantum Core Shutdown.")
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+import os
+import asyncio
+import argparse
+from dotenv import load_dotenv
+
+# Enterprise Core Imports
+from quantum_qe_core.skills.browser_pool import BrowserPool
+from quantum_qe_core.skills.reporter import TestReporter
+from quantum_qe_core.skills.knowledge import KnowledgeManager
+from quantum_qe_core.orchestrator import run_session, skips_security, DEFAULT_INSTRUCTIONS
+
+# Load environment variables
+load_dotenv()
+
+
+async def run_target(pool: BrowserPool, knowledge: KnowledgeManager, index: int, url: str, instructions: str, skip_security: bool):
+    """Runs one Navigator/Auditor session on a leased browser context."""
+    label = f"T{index}"
+    reporter = TestReporter(f"output/multi/target_{index}_report.pdf")
+    try:
+        async with pool.lease() as browser:
+            return await run_session(browser, reporter, knowledge, url, instructions,
+                                     skip_security or skips_security(instructions), label=label, interactive=False)
+    except Exception as e:
+        print(f"[{label}] Orchestration Error: {e}")
+        reporter.add_step(f"Orchestration Error: {e}", "FAIL")
+        return {"url": url, "error": str(e)}
+    finally:
+        try:
+            reporter.generate_report()
+        except Exception as e:
+            print(f"[{label}] Report Generation Failed: {e}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Quantum QE Core - run several targets in one browser process")
+    parser.add_argument("--url", type=str, action="append", required=True, help="Target URL (repeatable)")
+    parser.add_argument("--instructions", type=str, action="append", default=None,
+                        help="Instructions for the matching --url (repeatable). A single value applies to every URL.")
+    parser.add_argument("--headless", action="store_true", help="Run headless")
+    parser.add_argument("--skip-security", action="store_true", help="Skip the security audit phase")
+    parser.add_argument("--concurrency", type=int, default=3, help="Maximum concurrent browser contexts")
+    args = parser.parse_args()
+
+    instructions = args.instructions or [DEFAULT_INSTRUCTIONS]
+    if len(instructions) == 1:
+        instructions = instructions * len(args.url)
+    if len(instructions) != len(args.url):
+        print("Error: pass one --instructions per --url, or a single one for all of them.")
+        return
+
+    if not os.getenv("OPENAI_API_KEY") and os.getenv("QE_LLM_MODE", "live").lower() != "replay":
+        print("Error: OPENAI_API_KEY is missing.")
+        return
+
+    print(f"Initializing Quantum QE Core for {len(args.url)} targets (concurrency {args.concurrency})...")
+    pool = BrowserPool(headless=args.headless, max_contexts=args.concurrency)
+    knowledge = KnowledgeManager("quantum_qe_core/knowledge")
+
+    try:
+        await pool.start()
+        results = await asyncio.gather(*[
+            run_target(pool, knowledge, i + 1, url, text, args.skip_security)
+            for i, (url, text) in enumerate(zip(args.url, instructions))
+        ])
+        print("\n--- Summary ---")
+        for i, result in enumerate(results, start=1):
+            status = "ERROR" if result.get("error") else "DONE"
+            print(f"[T{i}] {status} {result.get('url')} -> output/multi/target_{i}_report.pdf")
+        print(f"Pool stats: {pool.stats}")
+    finally:
+        await pool.close()
+        print("Quantum Core Shutdown.")
+
+if __name__ == "__main__":
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    asyncio.run(main())
@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import time
+import hashlib
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from urllib.parse import urldefrag
+from langchain_core.tools import Tool
+
+COMPILABLE_TOOLS = ("Navigate", "ClickElement", "TypeText")
+# A final answer containing one of these is not treated as a successful run
+FAILURE_PHRASES = ("unable to", "could not", "couldn't", "failed", "not able to")
+DEFAULT_SCRIPT_DIR = os.path.join("output", "scripts")
+SCRIPT_VERSION = 2 # 2: per-step postconditions, no stored final answer
+EXPECTED_TEXTS = 3 # Texts a step made appear that its replay must find again
+EXPECTED_TEXT_LIMIT = 80
+VOLATILE_TEXT_RE = re.compile(r"\d{2,}") # Counters, dates, times: not stable across runs
+
+
+def _same_page(a: str, b: str) -> bool:
+    return urldefrag(a or "")[0].rstrip("/") == urldefrag(b or "")[0].rstrip("/")
+
+
+def _visible_texts(snapshot: Optional[Dict[str, Any]]) -> List[str]:
+    if not snapshot:
+        return []
+    return [e["text"] for e in snapshot.get("elements", []) if e.get("visible") and e.get("text")]
+
+
+async def _observe(browser_manager) -> Optional[Dict[str, Any]]:
+    """Extracts a snapshot without touching the browser's diff baseline; None if the page cannot be read."""
+    try:
+        return await browser_manager.dom_extractor.extract(browser_manager.page)
+    except Exception:
+        return None
+
+
+def expected_texts(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> List[str]:
+    """Short, stable texts visible after a step that were not visible before it (e.g. "Welcome, admin")."""
+    seen = set(_visible_texts(before))
+    texts = []
+    for text in _visible_texts(after):
+        if (text not in seen and text not in texts and len(text) <= EXPECTED_TEXT_LIMIT
+                and not VOLATILE_TEXT_RE.search(text)):
+            texts.append(text)
+    return texts[:EXPECTED_TEXTS]
+
+
+class ActionRecorder:
+    """Wraps the Navigator's browser tools and records every call with its outcome.
+
+    `on_step`, if given, is awaited with each successful step (e.g. to snapshot the
+    page state for an overlapped audit).
+    """
+
+    def __init__(self, browser_manager, on_step: Callable[[Dict[str, Any]], Awaitable] = None):
+        self.browser = browser_manager
+        self.on_step = on_step
+        self.steps = []
+        self._last = None # Snapshot observed after the previous recorded step
+
+    def reset(self):
+        self.steps = []
+        self._last = None
+
+    def wrap(self, tools: List[Any]) -> List[Any]:
+        wrapped = []
+        for tool in tools:
+            if isinstance(tool, Tool) and tool.name in COMPILABLE_TOOLS:
+                wrapped.append(Tool(name=tool.name, description=tool.description, func=tool.func,
+                                    coroutine=self._recording(tool)))
+            else:
+                wrapped.append(tool)
+        return wrapped
+
+    def _recording(self, tool: Tool):
+        async def call(tool_input: str):
+            result = await tool.coroutine(tool_input)
+            ok = not str(result).startswith("Error") if tool.name == "Navigate" else "Successfully" in str(result)
+            step = {"tool": tool.name, "input": tool_input, "ok": ok, "url": await self.browser.get_url(),
+                    "index": len(self.steps) + 1}
+            if ok:
+                snapshot = await _observe(self.browser)
+                step["texts"] = expected_texts(self._last, snapshot)
+                self._last = snapshot or self._last
+            self.steps.append(step)
+            if ok and self.on_step:
+                await self.on_step(step)
+            return result
+        return call
+
+    def compile(self, instruction: str, final_answer: str, used_human: bool) -> Optional[Dict[str, Any]]:
+        """Turns the recorded calls into a script, or None if the run does not look successful.
+
+        Failed calls are dropped (the LLM retried them some other way). Each kept step
+        carries postconditions: the URL the page was on after it ran and the texts it
+        made appear; clicks and typing also require their target to be visible.
+        """
+        steps = [{"tool": s["tool"], "input": s["input"], "expect_url": s["url"], "expect_texts": s["texts"]}
+                 for s in self.steps if s["ok"]]
+        if used_human or not steps or not self.steps[-1]["ok"]:
+            return None
+        if any(phrase in (final_answer or "").lower() for phrase in FAILURE_PHRASES):
+            return None
+        return {"version": SCRIPT_VERSION, "instruction": instruction, "steps": steps, "created": time.time()}
+
+
+class ActionScriptStore:
+    """Compiled Navigator runs, one JSON file per instruction."""
+
+    def __init__(self, path: str = DEFAULT_SCRIPT_DIR):
+        self.path = path
+
+    def _file(self, instruction: str) -> str:
+        return os.path.join(self.path, hashlib.sha256(instruction.strip().encode("utf-8")).hexdigest()[:16] + ".json")
+
+    def load(self, instruction: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file(instruction), "r", encoding="utf-8") as f:
+                script = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return script if script.get("version") == SCRIPT_VERSION else None
+
+    def save(self, script: Dict[str, Any]):
+        path = self._file(script["instruction"])
+        os.makedirs(self.path, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(script, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def discard(self, instruction: str):
+        try:
+            os.remove(self._file(instruction))
+        except OSError:
+            pass
+
+
+async def _target_visible(browser_manager, selector: str) -> bool:
+    try:
+        return await browser_manager.page.is_visible(selector)
+    except Exception:
+        return False
+
+
+async def replay_script(browser_manager, script: Dict[str, Any], reporter=None,
+                        on_step: Callable[[Dict[str, Any]], Awaitable] = None) -> Optional[str]:
+    """Executes a compiled script directly on the BrowserManager, without building LLM observations.
+
+    Every step's postconditions are checked on the live page: the target of a
+    click or typing step must be visible, and afterwards the page must be on the
+    recorded URL and show the recorded texts. Returns a result describing what
+    the replay verified, or None as soon as a step fails or a postcondition does
+    not hold; the caller then falls back to the LLM, and the step is reported as
+    INFO rather than as a functional failure.
+    """
+    verified = []
+    total = len(script["steps"])
+    for i, step in enumerate(script["steps"], 1):
+        tool, value = step["tool"], step["input"]
+        if tool == "Navigate":
+            await browser_manager.start()
+            try:
+                await browser_manager.page.goto(value, timeout=30000)
+                await browser_manager.wait_for_settle(label="script")
+                ok, description = True, f"Navigated to {value}"
+            except Exception as e:
+                ok, description = False, f"Navigation to {value} failed: {e}"
+        elif tool == "ClickElement":
+            if await _target_visible(browser_manager, value):
+                result = await browser_manager.click_element(value)
+                await browser_manager.wait_for_settle(label="script")
+                ok, description = "Successfully" in result, f"Clicked {value}. Result: {result}"
+            else:
+                ok, description = False, f"Click target {value} is not visible"
+        else:
+            selector, text = value.split("|", 1)
+            if await _target_visible(browser_manager, selector):
+                result = await browser_manager.type_text(selector, text)
+                ok, description = "Successfully" in result, f"Typed '{text}' into {selector}"
+            else:
+                ok, description = False, f"Input {selector} is not visible"
+
+        url = await browser_manager.get_url()
+        if ok and not _same_page(url, step["expect_url"]):
+            ok, description = False, f"{description} (expected {step['expect_url']}, on {url})"
+        if ok and step["expect_texts"]:
+            page_text = "\n".join(_visible_texts(await _observe(browser_manager)))
+            missing = [t for t in step["expect_texts"] if t not in page_text]
+            if missing:
+                ok, description = False, f"{description} (expected text not shown: {', '.join(map(repr, missing))})"
+            else:
+                verified.extend(step["expect_texts"])
+        if reporter:
+            if ok:
+                await browser_manager.record_step(reporter, f"[Script {i}/{total}] {description}", "PASS")
+            else:
+                await browser_manager.record_step(
+                    reporter, f"[Script {i}/{total}] {description} - script out of date, rerunning with the LLM", "INFO")
+        if not ok:
+            print(f"[NAVIGATOR] Script step {i} failed, falling back to the LLM: {description}")
+            return None
+        if on_step:
+            await on_step({"tool": tool, "input": value, "ok": True, "url": url, "index": i})
+
+    checks = f"; verified text: {', '.join(map(repr, verified))}" if verified else ""
+    return (f"Replayed the recorded flow ({total} steps) without the LLM. Every step passed its postconditions; "
+            f"final page {await browser_manager.get_url()}{checks}.")
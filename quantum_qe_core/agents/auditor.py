@@ -1,10 +1,18 @@
-from langchain_openai import ChatOpenAI
+import asyncio
 from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import SystemMessage
+from quantum_qe_core.agents.llm_cache import create_chat_model
+from langchain_core.messages import SystemMessage, HumanMessage
 from quantum_qe_core.skills.browser import BrowserManager
 from quantum_qe_core.skills.scanner import SecurityAuditor
 from quantum_qe_core.skills.reporter import TestReporter
 from quantum_qe_core.skills.knowledge import KnowledgeManager
+from quantum_qe_core.tracing import span
+
+SEVERITY_ORDER = ["Critical", "High", "Medium", "Low", "Info"]
+SUMMARY_FINDINGS = 40 # Findings listed in the summary prompt, most severe first
+SUMMARY_PROMPT = """You are the 'Auditor Agent' (AppSec Specialist). Summarize this automated security audit
+for the test report: the overall risk, the most important findings and what to fix first.
+Be concise (at most 8 sentences) and do not invent findings that are not listed."""
 
 class AuditorAgent:
     def __init__(self, browser_manager: BrowserManager, reporter: TestReporter = None, knowledge_manager: KnowledgeManager = None):
@@ -12,7 +20,7 @@ class AuditorAgent:
         self.browser = browser_manager
         self.reporter = reporter
         self.knowledge = knowledge_manager
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0)
+        self.llm = create_chat_model("gpt-4o", temperature=0) # Cached/replayable, see QE_LLM_MODE
         
         # Tools depend on browser manager instance
         self.tools = self.scanner.get_tools(self.browser)
@@ -35,12 +43,76 @@ Your goal is to identify security vulnerabilities.
 # Constraints:
 - You operate on the page that the Navigator has already navigated to.
 - Use 'SecurityActiveScan' and 'SecurityPassiveScan' tools.
+- Use 'SecuritySensitiveDataScan' to check the page for exposed secrets and PII (captured responses are checked automatically by 'SecurityPassiveScan').
+- Prefer 'SecurityHttpFuzz' for pages with server-side forms; it is much faster than 'SecurityActiveScan'.
 - Use 'SearchSecurityStandards' for additional context on vulnerabilities.
 - Do NOT navigate away unless indispensable.
 """
         model_with_tools = self.llm.bind_tools(self.tools, parallel_tool_calls=False)
         return create_react_agent(model_with_tools, self.tools, prompt=system_message)
 
+    async def run_fast(self, active: str = "http", summarize: bool = True) -> str:
+        """Runs the audit the LLM loop usually performs as a fixed pipeline, without the loop.
+
+        Passive (headers/cookies), secrets/PII and HTTP form fuzzing run concurrently
+        on the current page (all of them only read the shared page; fuzzing
+        confirms hits in a clone). active="browser" adds the browser-driven fuzzer
+        afterwards, None skips fuzzing. Findings are enriched from the knowledge
+        base deterministically. The LLM is called once for the summary, or not at
+        all with summarize=False.
+        """
+        url = await self.browser.get_url()
+        print(f"[AUDITOR] Fast audit of {url}")
+        scans = [self.scanner.passive_scan(self.browser, url), self._scan_page_content(url)]
+        if active == "http":
+            scans.append(self.scanner.http_scan(self.browser))
+        with span("audit/fast", "scan"):
+            results = await asyncio.gather(*scans, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self.browser.logs.append(f"[ERROR] Fast audit scan failed: {result}")
+            if active == "browser":
+                await self.scanner.active_scan(self.browser)
+
+        if self.knowledge:
+            self.knowledge.enrich(self.scanner.get_findings())
+        findings = sorted(self.scanner.get_findings(), key=lambda f: SEVERITY_ORDER.index(f["severity"])
+                          if f.get("severity") in SEVERITY_ORDER else len(SEVERITY_ORDER))
+
+        overview = self._overview(url, findings)
+        if not summarize or not findings:
+            return overview
+        try:
+            with span("audit/summary", "agent"):
+                response = await self.llm.ainvoke([SystemMessage(content=SUMMARY_PROMPT),
+                                                   HumanMessage(content=self._findings_digest(url, findings))])
+            return f"{overview}\n{response.content}"
+        except Exception as e:
+            print(f"[AUDITOR] Summary failed, using the deterministic overview: {e}")
+            return overview
+
+    async def _scan_page_content(self, url: str):
+        self.scanner.scan_sensitive_data(await self.browser.get_content(), url)
+
+    @staticmethod
+    def _overview(url: str, findings: list) -> str:
+        counts = {}
+        for finding in findings:
+            counts[finding.get("severity", "Info")] = counts.get(finding.get("severity", "Info"), 0) + 1
+        by_severity = ", ".join(f"{counts[s]} {s}" for s in SEVERITY_ORDER if s in counts) or "none"
+        return f"Fast audit of {url}: {len(findings)} findings ({by_severity})."
+
+    @staticmethod
+    def _findings_digest(url: str, findings: list) -> str:
+        lines = [f"Audited page: {url}", f"Findings ({len(findings)}, most severe first):"]
+        for finding in findings[:SUMMARY_FINDINGS]:
+            reference = finding.get("reference")
+            cite = f" [ref: {' - '.join(filter(None, [reference['source'], reference['title']]))}]" if reference else ""
+            lines.append(f"- [{finding.get('severity')}] {finding.get('type')}: {finding.get('details')}{cite}")
+        if len(findings) > SUMMARY_FINDINGS:
+            lines.append(f"- ... and {len(findings) - SUMMARY_FINDINGS} more")
+        return "\n".join(lines)
+
     async def run(self, instruction: str):
         print(f"[AUDITOR] Running with instruction: {instruction}")
         inputs = {"messages": [{"role": "user", "content": instruction}]}
@@ -0,0 +1,185 @@
+import os
+import json
+import hashlib
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, AIMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatResult, ChatGeneration
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from quantum_qe_core.tracing import TRACE_CALLBACK
+
+# QE_LLM_MODE: "live" (no cache at all, default), "cache" (read-through), "record" (always call, store),
+# "replay" (store only, no network). Caching is opt-in: a QA run must not replay decisions made against
+# an earlier version of the app unless asked to.
+LLM_MODES = ("live", "cache", "record", "replay")
+DEFAULT_MODE = "live"
+DEFAULT_CACHE_DIR = os.path.join("output", "cache", "llm")
+CACHE_VERSION = 1
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _normalize(message: BaseMessage) -> dict:
+    """The parts of a message that affect the model's answer (no run ids or timestamps)."""
+    data = {"type": message.type, "content": message.content}
+    for field in ("tool_call_id", "name"):
+        if getattr(message, field, None):
+            data[field] = getattr(message, field)
+    if getattr(message, "tool_calls", None):
+        data["tool_calls"] = [{"name": c["name"], "args": c["args"], "id": c.get("id")} for c in message.tool_calls]
+    return data
+
+
+class LLMCacheStore:
+    """Content-addressed response store: one JSON file per request hash.
+
+    Files are written atomically and touched on every hit, so eviction drops the
+    least recently used entries once `max_entries` is exceeded. Safe to share
+    between processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_DIR, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._writes_since_evict = 0
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._file(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path) # LRU bookkeeping
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return entry
+
+    def put(self, key: str, entry: dict):
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        self.stats["writes"] += 1
+        self._writes_since_evict += 1
+        if self._writes_since_evict >= max(1, self.max_entries // 10):
+            self.evict()
+
+    def evict(self):
+        self._writes_since_evict = 0
+        entries = []
+        for root, _, files in os.walk(self.path):
+            for file in files:
+                if file.endswith(".json"):
+                    path = os.path.join(root, file)
+                    try:
+                        entries.append((os.stat(path).st_mtime, path))
+                    except OSError:
+                        continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+                self.stats["evictions"] += 1
+            except OSError:
+                pass
+
+
+class CachingChatModel(BaseChatModel):
+    """Chat model wrapper that serves repeated requests from an LLMCacheStore.
+
+    The key is a SHA-256 over the model name, its sampling parameters, the
+    normalized messages and the bound tool schemas, so any change to the prompt,
+    the page observation or the tool set is a miss. In replay mode there is no
+    inner model at all (no API key or network needed) and a miss raises
+    LLMCacheMiss.
+    """
+
+    inner: Optional[BaseChatModel] = None
+    store: Any = None
+    mode: str = "cache"
+    model_name: str = "gpt-4o"
+    temperature: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "qe-caching-chat-model"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def cache_key(self, messages: List[BaseMessage], stop: Optional[List[str]], **kwargs) -> str:
+        payload = {
+            "version": CACHE_VERSION,
+            "model": self.model_name,
+            "temperature": self.temperature,
+            "stop": stop,
+            "messages": [_normalize(m) for m in messages],
+            "kwargs": kwargs, # tools, tool_choice, parallel_tool_calls ...
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[ChatResult]:
+        if self.mode in ("cache", "replay"):
+            entry = self.store.get(key)
+            if entry:
+                if not _WARNED:
+                    _WARNED.append(self.mode)
+                    print(f"[LLM] Serving stored responses (QE_LLM_MODE={self.mode}): agent decisions may come "
+                          f"from an earlier run against a different version of the app")
+                message = messages_from_dict([entry["message"]])[0]
+                message.response_metadata["qe_cache"] = "hit"
+                return ChatResult(generations=[ChatGeneration(message=message)])
+        if self.mode == "replay":
+            raise LLMCacheMiss(f"No recorded LLM response for request {key[:12]} (QE_LLM_MODE=replay)")
+        return None
+
+    def _save(self, key: str, message: AIMessage) -> ChatResult:
+        if self.mode in ("cache", "record"):
+            self.store.put(key, {"model": self.model_name, "message": message_to_dict(message)})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self.cache_key(messages, stop, **kwargs)
+        return self._lookup(key) or self._save(key, self.inner.invoke(messages, stop=stop, **kwargs))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self.cache_key(messages, stop, **kwargs)
+        return self._lookup(key) or self._save(key, await self.inner.ainvoke(messages, stop=stop, **kwargs))
+
+
+_STORES = {}
+_WARNED = [] # The stored-response warning is printed once per process
+
+
+def cache_stats() -> dict:
+    """Hit/miss/write counters of every cache directory used in this process."""
+    return {directory: dict(store.stats) for directory, store in _STORES.items()}
+
+
+def create_chat_model(model: str = "gpt-4o", temperature: float = 0, mode: str = None, cache_dir: str = None):
+    """Chat model for the agents, honouring QE_LLM_MODE and QE_LLM_CACHE_DIR."""
+    mode = (mode or os.getenv("QE_LLM_MODE", DEFAULT_MODE)).lower()
+    if mode not in LLM_MODES:
+        raise ValueError(f"Unknown QE_LLM_MODE '{mode}', expected one of {', '.join(LLM_MODES)}")
+
+    inner = None
+    if mode != "replay":
+        from langchain_openai import ChatOpenAI
+        if mode == "live":
+            return ChatOpenAI(model=model, temperature=temperature, callbacks=[TRACE_CALLBACK])
+        inner = ChatOpenAI(model=model, temperature=temperature)
+
+    cache_dir = cache_dir or os.getenv("QE_LLM_CACHE_DIR", DEFAULT_CACHE_DIR)
+    store = _STORES.setdefault(cache_dir, LLMCacheStore(cache_dir)) # One store (and its stats) per directory
+    # Traced on the wrapper only, so cache hits show up and real calls are not counted twice
+    return CachingChatModel(inner=inner, store=store, mode=mode, model_name=model, temperature=temperature,
+                            callbacks=[TRACE_CALLBACK])
@@ -1,8 +1,11 @@
-from langchain_openai import ChatOpenAI
+import os
 from langgraph.prebuilt import create_react_agent
+from quantum_qe_core.agents.llm_cache import create_chat_model
+from quantum_qe_core.agents.action_script import ActionRecorder, ActionScriptStore, replay_script
 from langchain_core.messages import SystemMessage
 from quantum_qe_core.skills.browser import BrowserManager
 from quantum_qe_core.skills.reporter import TestReporter
+from quantum_qe_core.tracing import span
 
 from langchain_core.tools import tool
 
@@ -19,11 +22,19 @@ def ask_human(question: str) -> str:
 
 
 class NavigatorAgent:
-    def __init__(self, browser_manager: BrowserManager, reporter: TestReporter = None):
+    def __init__(self, browser_manager: BrowserManager, reporter: TestReporter = None,
+                 scripts: ActionScriptStore = None, on_step=None, interactive: bool = True):
         self.browser = browser_manager
         self.reporter = reporter
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0)
-        self.tools = self.browser.get_tools(self.reporter) + [ask_human]
+        self.llm = create_chat_model("gpt-4o", temperature=0) # Cached/replayable, see QE_LLM_MODE
+        # Successful runs are compiled to action scripts and replayed without the LLM (QE_ACTION_SCRIPTS=0 disables)
+        if scripts is None and os.getenv("QE_ACTION_SCRIPTS", "1") != "0":
+            scripts = ActionScriptStore()
+        self.scripts = scripts
+        self.recorder = ActionRecorder(self.browser, on_step) # on_step: awaited after every successful browser step
+        # Unattended runs (batches, concurrent targets) get no ask_human: input() would block on a shared terminal
+        self.interactive = interactive
+        self.tools = self.recorder.wrap(self.browser.get_tools(self.reporter)) + ([ask_human] if interactive else [])
         self.agent_graph = self._setup_agent()
 
     def _setup_agent(self):
@@ -42,15 +53,36 @@ Your goal is to perform functional testing on web applications.
 - Execute tools sequentially.
 - If you are stuck or encounter a timeout/error, use the 'ask_human' tool to request assistance.
 """
+        if not self.interactive:
+            system_message = system_message.replace(
+                "use the 'ask_human' tool to request assistance.",
+                "stop and state in your final answer what blocked you; no human is available.")
         model_with_tools = self.llm.bind_tools(self.tools, parallel_tool_calls=False)
         return create_react_agent(model_with_tools, self.tools, prompt=system_message)
     
     async def run(self, instruction: str):
         print(f"[NAVIGATOR] Running with instruction: {instruction}")
+        self.browser.set_instruction_hint(instruction)
+
+        script = self.scripts.load(instruction) if self.scripts else None
+        if script:
+            print(f"[NAVIGATOR] Replaying compiled script ({len(script['steps'])} steps)")
+            with span("navigator/script_replay", "agent", steps=len(script["steps"])):
+                replayed = await replay_script(self.browser, script, self.reporter, self.recorder.on_step)
+            if replayed is not None:
+                return replayed
+            self.scripts.discard(instruction)
+
+        self.recorder.reset()
         inputs = {"messages": [{"role": "user", "content": instruction}]}
         result = await self.agent_graph.ainvoke(inputs)
         
         messages = result.get("messages", [])
         if messages and hasattr(messages[-1], "content"):
+            if self.scripts:
+                used_human = any(call["name"] == "ask_human" for m in messages for call in getattr(m, "tool_calls", None) or [])
+                compiled = self.recorder.compile(instruction, messages[-1].content, used_human)
+                if compiled:
+                    self.scripts.save(compiled)
             return messages[-1].content
         return "No response from Navigator."
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from typing import List, Dict, Any, Callable
+from quantum_qe_core.skills.reporter import TestReporter
+from quantum_qe_core.orchestrator import run_session, skips_security, DEFAULT_INSTRUCTIONS
+
+# A checkpointed result with one of these statuses is not run again on resume (unless retrying)
+DONE_STATUSES = ("completed",)
+SCENARIO_FIELDS = ("id", "url", "instructions", "skip_security", "timeout", "crawl_pages", "crawl_active",
+                   "overlap_audit", "fast_audit", "summarize")
+
+
+def _scenario_id(scenario: Dict[str, Any]) -> str:
+    key = f"{scenario.get('url') or ''}\n{scenario.get('instructions') or ''}"
+    return "s-" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:10]
+
+
+def load_scenarios(path: str) -> List[Dict[str, Any]]:
+    """Reads scenarios from YAML (a list, or {"defaults": {...}, "scenarios": [...]}) or JSONL.
+
+    Every scenario gets a stable id (given, or derived from url + instructions) so
+    checkpoints can be matched across runs.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            data = yaml.safe_load(f) or []
+        else:
+            data = [json.loads(line) for line in f if line.strip()]
+    defaults = {}
+    if isinstance(data, dict):
+        defaults, data = data.get("defaults") or {}, data.get("scenarios") or []
+
+    scenarios, ids = [], set()
+    for i, entry in enumerate(data, start=1):
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        unknown = set(entry) - set(SCENARIO_FIELDS)
+        if unknown:
+            raise ValueError(f"Scenario {i} in {path}: unknown fields {sorted(unknown)}")
+        scenario = dict(defaults, **entry)
+        scenario.setdefault("instructions", DEFAULT_INSTRUCTIONS)
+        scenario["id"] = str(scenario.get("id") or _scenario_id(scenario))
+        if scenario["id"] in ids:
+            raise ValueError(f"Scenario {i} in {path}: duplicate id '{scenario['id']}'")
+        ids.add(scenario["id"])
+        scenarios.append(scenario)
+    return scenarios
+
+
+def pending_scenarios(scenarios: List[Dict[str, Any]], done: Dict[str, Dict[str, Any]],
+                      retry_failed: bool = False) -> List[Dict[str, Any]]:
+    """Scenarios without a checkpointed result (or, with retry_failed, without a completed one)."""
+    def finished(result):
+        return result and (result["status"] in DONE_STATUSES or not retry_failed)
+    return [s for s in scenarios if not finished(done.get(s["id"]))]
+
+
+def write_summary(results: List[Dict[str, Any]], out_dir: str) -> Dict[str, str]:
+    """Writes summary.json and one aggregate PDF that contains every scenario's steps."""
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    summary_path = os.path.join(out_dir, "summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump({"counts": counts, "total_seconds": round(sum(r.get("duration", 0) for r in results), 2),
+                   "scenarios": results}, f, indent=2, default=str)
+
+    reporter = TestReporter(os.path.join(out_dir, "aggregate_report.pdf"))
+    for result in results:
+        status = "PASS" if result["status"] in DONE_STATUSES else "FAIL"
+        reporter.add_step(f"Scenario {result['id']} ({result.get('url') or 'no url'}): {result['status']} "
+                          f"in {result.get('duration', 0):.1f}s" + (f" - {result['error']}" if result.get("error") else ""),
+                          status)
+        if result.get("journal") and os.path.exists(result["journal"]):
+            reporter.extend_from_journal(result["journal"], prefix=f"[{result['id']}] ")
+    reporter.generate_report()
+    return {"summary": summary_path, "report": reporter.filename}
+
+
+class Checkpoint:
+    """Append-only JSONL of finished scenario results, fsynced per line like the report journal."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Latest result per scenario id."""
+        results = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for record in TestReporter._records(f):
+                    results[record["id"]] = record
+        return results
+
+    def append(self, result: Dict[str, Any]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class BatchRunner:
+    """Runs many scenarios in one process: one Chromium, a pool of contexts, shared agents' resources.
+
+    Scenarios are taken from a queue by `concurrency` workers, each leasing a
+    context from the BrowserPool for one Navigator/Auditor session with a
+    per-scenario timeout. Each scenario writes its own report under
+    `<out_dir>/scenarios/<id>/`; its result is checkpointed as soon as it ends,
+    so an interrupted batch resumes with the scenarios that have no completed
+    result.
+    """
+
+    def __init__(self, pool, knowledge, out_dir: str = "output/batch", concurrency: int = 3,
+                 timeout: float = 600.0, retry_failed: bool = False,
+                 on_result: Callable[[Dict[str, Any]], None] = None, checkpoint: bool = True):
+        self.pool = pool
+        self.knowledge = knowledge
+        self.out_dir = out_dir
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retry_failed = retry_failed
+        # Shard processes leave checkpointing to the parent and report through on_result
+        self.checkpoint = Checkpoint(os.path.join(out_dir, "checkpoint.jsonl")) if checkpoint else None
+        self.on_result = on_result
+
+    def report_path(self, scenario_id: str) -> str:
+        return os.path.join(self.out_dir, "scenarios", scenario_id, "report.pdf")
+
+    async def run_scenario(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        label = scenario["id"]
+        reporter = TestReporter(self.report_path(label))
+        result = {"id": label, "url": scenario.get("url"), "status": "completed", "error": None,
+                  "report": reporter.filename, "journal": reporter.journal_path}
+        start = time.monotonic()
+        timeout = scenario.get("timeout") or self.timeout
+        instructions = scenario["instructions"]
+        try:
+            async with self.pool.lease() as browser:
+                session = await asyncio.wait_for(run_session(
+                    browser, reporter, self.knowledge, scenario.get("url"), instructions,
+                    scenario.get("skip_security") or skips_security(instructions), label=label,
+                    crawl_pages=scenario.get("crawl_pages", 0), crawl_active=scenario.get("crawl_active"),
+                    overlap_audit=scenario.get("overlap_audit", False), fast_audit=scenario.get("fast_audit", False),
+                    summarize=scenario.get("summarize", True), interactive=False), timeout)
+            result.update(navigator=session.get("navigator"), auditor=session.get("auditor"))
+        except asyncio.TimeoutError:
+            result.update(status="timeout", error=f"Timed out after {timeout}s")
+            reporter.add_step(f"Scenario timed out after {timeout}s", "FAIL")
+        except Exception as e:
+            result.update(status="error", error=str(e))
+            reporter.add_step(f"Orchestration Error: {e}", "FAIL")
+        result["duration"] = round(time.monotonic() - start, 2)
+        result["finished"] = time.time()
+        try:
+            reporter.generate_report()
+        except Exception as e:
+            print(f"[{label}] Report Generation Failed: {e}")
+        if self.checkpoint:
+            self.checkpoint.append(result)
+        if self.on_result:
+            self.on_result(result)
+        print(f"[{label}] {result['status'].upper()} in {result['duration']:.1f}s")
+        return result
+
+    async def run(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Runs every scenario without a completed checkpoint; returns results for all, in input order."""
+        done = self.checkpoint.load() if self.checkpoint else {}
+        todo = pending_scenarios(scenarios, done, self.retry_failed)
+        workers = max(1, min(self.concurrency, len(todo)))
+        print(f"[BATCH] {len(scenarios)} scenarios, {len(scenarios) - len(todo)} already done, "
+              f"{len(todo)} to run ({workers} workers)")
+
+        queue = asyncio.Queue()
+        for scenario in todo:
+            queue.put_nowait(scenario)
+
+        async def worker():
+            while not queue.empty():
+                scenario = queue.get_nowait()
+                done[scenario["id"]] = await self.run_scenario(scenario)
+
+        await asyncio.gather(*[worker() for _ in range(workers)])
+        return [done[s["id"]] for s in scenarios if s["id"] in done]
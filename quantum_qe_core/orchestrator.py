@@ -0,0 +1,114 @@
+from quantum_qe_core.skills.browser import BrowserManager
+from quantum_qe_core.skills.reporter import TestReporter
+from quantum_qe_core.skills.knowledge import KnowledgeManager
+from quantum_qe_core.agents.navigator import NavigatorAgent
+from quantum_qe_core.agents.auditor import AuditorAgent
+from quantum_qe_core.skills.crawler import Crawler, CrawlScope
+from quantum_qe_core.skills.snapshot_audit import SnapshotAuditor
+from quantum_qe_core.tracing import span
+
+DEFAULT_INSTRUCTIONS = "Login as admin/password and search for XSS payload."
+SKIP_SECURITY_PHRASES = ["no security", "no hagas un check de seguridad"]
+
+
+def skips_security(instructions: str) -> bool:
+    """Heuristic: Check if instructions imply skipping security."""
+    return any(phrase in instructions.lower() for phrase in SKIP_SECURITY_PHRASES)
+
+
+async def run_session(browser: BrowserManager, reporter: TestReporter, knowledge: KnowledgeManager,
+                      url: str = None, instructions: str = DEFAULT_INSTRUCTIONS,
+                      skip_security: bool = False, label: str = "", crawl_pages: int = 0,
+                      crawl_active: str = None, overlap_audit: bool = False, fast_audit: bool = False,
+                      summarize: bool = True, interactive: bool = True) -> dict:
+    """Runs the Navigator phase and, unless skipped, the Auditor phase on one browser session.
+
+    With crawl_pages > 0 the Auditor phase starts with a crawl from the page the
+    Navigator reached, in the same (possibly logged-in) session, scanning every
+    distinct page state it finds.
+
+    With overlap_audit the Auditor does not wait for the Navigator: every state the
+    Navigator reaches is snapshotted and audited in its own browser context while
+    navigation continues, and the LLM audit of the final page is skipped. Findings
+    are reported per Navigator step. Audits still running when the session ends
+    early (error or timeout) are cancelled.
+
+    With fast_audit the final page is audited by the fixed scanner pipeline
+    (AuditorAgent.run_fast) instead of the LLM tool loop; summarize=False also
+    skips its single LLM summary call.
+
+    interactive=False builds the Navigator without ask_human, for unattended runs
+    where several sessions share one terminal.
+    """
+    prefix = f"[{label}] " if label else ""
+    # Passive audits run during navigation; forms are fuzzed once it is over
+    snapshots = SnapshotAuditor(browser, reporter, active="http") if overlap_audit and not skip_security else None
+    navigator = NavigatorAgent(browser, reporter, on_step=snapshots.snapshot if snapshots else None,
+                               interactive=interactive)
+    auditor = AuditorAgent(browser, reporter, knowledge)
+    results = {"url": url, "navigator": None, "auditor": None}
+
+    try:
+        # Phase 1: Functional Testing (Navigator)
+        print(f"\n{prefix}--- Phase 1: Functional Testing (Navigator) ---")
+        if url:
+            nav_instruction = f"1. Navigate to {url}\n2. {instructions}"
+        else:
+            nav_instruction = instructions
+
+        with span("phase/navigator", "phase"):
+            nav_result = await navigator.run(nav_instruction)
+        results["navigator"] = nav_result
+        print(f"{prefix}Navigator Result: {nav_result}")
+        reporter.add_step(f"Navigator Phase Complete: {nav_result}", "INFO")
+
+        # Phase 2: Security Audit (Auditor)
+        if not skip_security:
+            print(f"\n{prefix}--- Phase 2: Security Audit (Auditor) ---")
+            # Auditor inherits the current browser state from Navigator
+            current_url = await browser.get_url()
+            print(f"{prefix}[INFO] Auditing Current URL: {current_url}")
+
+            if crawl_pages:
+                print(f"{prefix}[INFO] Crawling up to {crawl_pages} pages from {current_url}")
+                crawler = Crawler(auditor.scanner, CrawlScope.for_urls([current_url]), browser=browser,
+                                  max_pages=crawl_pages, active=crawl_active)
+                pages = await crawler.crawl([current_url])
+                results["crawl"] = crawler.stats
+                reporter.add_step(f"Crawl Complete: {crawler.stats['visited']} pages, {len(crawler.states)} distinct states, "
+                                  f"{len(pages) - len(crawler.states)} duplicate or failed", "INFO")
+                reporter.log_security_finding(list(auditor.scanner.get_findings()))
+
+            new_findings = [] # Findings the audit step below lists (run_fast only; the LLM loop reports in text)
+            if snapshots:
+                with span("phase/auditor", "phase"):
+                    audited = await snapshots.finish() # Passive audits usually done already; forms are fuzzed now
+                for snapshot in audited:
+                    error = f" - audit failed: {snapshot['error']}" if snapshot["error"] else ""
+                    reporter.add_step(f"Audit of Navigator step {snapshot['step']} ({snapshot['description']}, "
+                                      f"{snapshot['url']}): {len(snapshot['findings'])} findings{error}",
+                                      "FAIL" if snapshot["error"] else "INFO")
+                    reporter.log_security_finding(snapshot["findings"])
+                audit_result = (f"Audited {len(audited)} page states during navigation: "
+                                f"{len(snapshots.findings())} findings.")
+            elif fast_audit:
+                logged = len(auditor.scanner.get_findings()) # Crawl findings are already in the report
+                with span("phase/auditor", "phase"):
+                    audit_result = await auditor.run_fast(summarize=summarize)
+                new_findings = auditor.scanner.get_findings()[logged:]
+            else:
+                audit_instruction = f"Perform a comprehensive security audit on the current page ({current_url}). Check for headers, cookies, and active vulnerabilities. If you find vulnerabilities, verify details with 'SearchSecurityStandards'."
+                with span("phase/auditor", "phase"):
+                    audit_result = await auditor.run(audit_instruction)
+            results["auditor"] = audit_result
+            print(f"{prefix}Auditor Result: {audit_result}")
+            reporter.add_step(f"Auditor Phase Complete (URL: {current_url}): {audit_result}", "INFO")
+            reporter.log_security_finding(list(new_findings))
+        else:
+            print(f"\n{prefix}--- Phase 2: Security Audit (Skipped by user request) ---")
+            reporter.add_step("Security Audit Skipped by user request", "INFO")
+    finally:
+        if snapshots:
+            await snapshots.cancel() # No-op after finish(); otherwise stops audits of an aborted session
+
+    return results
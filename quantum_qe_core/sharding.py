@@ -0,0 +1,173 @@
+import os
+import json
+import heapq
+import asyncio
+import statistics
+import multiprocessing
+from multiprocessing.connection import wait
+from typing import List, Dict, Any
+from quantum_qe_core.batch import BatchRunner, Checkpoint, pending_scenarios
+
+DEFAULT_ESTIMATE = 120.0 # Seconds assumed for a scenario that never ran (when there is no history at all)
+HISTORY_WEIGHT = 0.5 # Weight of the newest duration in the moving average
+
+
+class DurationHistory:
+    """Moving average of each scenario's duration, persisted next to the checkpoint."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.durations = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.durations = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def estimate(self, scenario: Dict[str, Any]) -> float:
+        """Known average, else the median of all known ones, else DEFAULT_ESTIMATE."""
+        if scenario["id"] in self.durations:
+            return self.durations[scenario["id"]]
+        if self.durations:
+            return statistics.median(self.durations.values())
+        return DEFAULT_ESTIMATE
+
+    def record(self, scenario_id: str, seconds: float):
+        previous = self.durations.get(scenario_id)
+        self.durations[scenario_id] = seconds if previous is None else (
+            HISTORY_WEIGHT * seconds + (1 - HISTORY_WEIGHT) * previous)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.durations, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+
+def plan_shards(scenarios: List[Dict[str, Any]], shards: int, history: DurationHistory) -> List[List[Dict[str, Any]]]:
+    """Longest-processing-time-first: each scenario, longest estimate first, goes to the least loaded shard.
+
+    Within a shard the longest scenarios also run first, so a straggler does not
+    start last.
+    """
+    plan = [[] for _ in range(max(1, shards))]
+    loads = [(0.0, i) for i in range(len(plan))]
+    for scenario in sorted(scenarios, key=history.estimate, reverse=True):
+        load, i = heapq.heappop(loads)
+        plan[i].append(scenario)
+        heapq.heappush(loads, (load + history.estimate(scenario), i))
+    return [shard for shard in plan if shard]
+
+
+def _shard_main(index: int, scenarios: List[Dict[str, Any]], options: Dict[str, Any], conn):
+    """Entry point of a shard process: its own event loop, Chromium and agents."""
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+    try:
+        asyncio.run(_run_shard(scenarios, options, conn))
+    finally:
+        conn.close()
+
+
+async def _run_shard(scenarios: List[Dict[str, Any]], options: Dict[str, Any], conn):
+    from quantum_qe_core.skills.browser_pool import BrowserPool
+    from quantum_qe_core.skills.knowledge import KnowledgeManager
+
+    pool = BrowserPool(headless=options["headless"], max_contexts=options["concurrency"])
+    knowledge = KnowledgeManager(options["knowledge_path"])
+    try:
+        knowledge.warm() # Normally a cache hit: the parent warmed the index before spawning
+    except Exception as e:
+        print(f"[SHARD] Knowledge index warm-up failed, indexing on first query instead: {e}")
+    runner = BatchRunner(pool, knowledge, options["out_dir"], concurrency=options["concurrency"],
+                         timeout=options["timeout"], checkpoint=False,
+                         on_result=lambda result: conn.send(result))
+    try:
+        await pool.start()
+        await runner.run(scenarios)
+    finally:
+        await pool.close()
+
+
+class ShardedExecutor:
+    """Splits a scenario suite over worker processes, each with its own browser and event loop.
+
+    One process is CPU-bound on its event loop (LLM response parsing, DOM
+    serialization, BeautifulSoup); separate processes scale with cores. Pending
+    scenarios are balanced by historical duration (plan_shards), every shard
+    runs them through a BatchRunner and sends each result back over a pipe as
+    soon as it finishes. The parent is the only writer of the checkpoint and
+    the duration history, so resuming works as for a single-process batch, and
+    the per-scenario report journals are merged by write_summary afterwards.
+    """
+
+    def __init__(self, processes: int = None, out_dir: str = "output/batch", concurrency: int = 1,
+                 timeout: float = 600.0, headless: bool = True, retry_failed: bool = False,
+                 knowledge_path: str = "quantum_qe_core/knowledge"):
+        self.processes = processes or os.cpu_count() or 1
+        self.out_dir = out_dir
+        self.retry_failed = retry_failed
+        self.options = {"out_dir": out_dir, "concurrency": concurrency, "timeout": timeout, "headless": headless,
+                        "knowledge_path": knowledge_path}
+        self.checkpoint = Checkpoint(os.path.join(out_dir, "checkpoint.jsonl"))
+        self.history = DurationHistory(os.path.join(out_dir, "durations.json"))
+
+    def run(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Runs pending scenarios across the shards; returns results for all scenarios, in input order."""
+        done = self.checkpoint.load()
+        todo = pending_scenarios(scenarios, done, self.retry_failed)
+        plan = plan_shards(todo, min(self.processes, len(todo)), self.history)
+        print(f"[SHARD] {len(scenarios)} scenarios, {len(scenarios) - len(todo)} already done, {len(todo)} to run "
+              f"on {len(plan)} processes (estimated load per shard: "
+              f"{', '.join(f'{sum(map(self.history.estimate, shard)):.0f}s' for shard in plan)})")
+
+        if plan:
+            # One build of the knowledge index cache instead of every shard racing to write it
+            from quantum_qe_core.skills.knowledge import KnowledgeManager
+            try:
+                KnowledgeManager(self.options["knowledge_path"]).warm()
+            except Exception as e:
+                print(f"[SHARD] Knowledge index warm-up failed: {e}")
+
+        context = multiprocessing.get_context("spawn") # Playwright and threads do not survive fork
+        workers = {}
+        for index, shard in enumerate(plan):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_shard_main, args=(index, shard, self.options, sender),
+                                      name=f"qe-shard-{index}", daemon=True)
+            process.start()
+            sender.close() # Only the child writes; EOF arrives when it exits
+            workers[receiver] = (process, shard)
+
+        reported = set()
+        try:
+            open_pipes = list(workers)
+            while open_pipes:
+                for receiver in wait(open_pipes):
+                    try:
+                        result = receiver.recv()
+                    except EOFError:
+                        open_pipes.remove(receiver)
+                        continue
+                    self._record(result, done)
+                    reported.add(result["id"])
+        finally:
+            for process, _ in workers.values():
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self.history.save()
+
+        # Scenarios of a shard that died before reporting them
+        for process, shard in workers.values():
+            for scenario in shard:
+                if scenario["id"] not in reported:
+                    self._record({"id": scenario["id"], "url": scenario.get("url"), "status": "error",
+                                  "error": f"Shard process {process.name} exited with code {process.exitcode}",
+                                  "duration": 0.0}, done)
+        return [done[s["id"]] for s in scenarios if s["id"] in done]
+
+    def _record(self, result: Dict[str, Any], done: Dict[str, Dict[str, Any]]):
+        done[result["id"]] = result
+        self.checkpoint.append(result)
+        if result["status"] != "error":
+            self.history.record(result["id"], result["duration"])
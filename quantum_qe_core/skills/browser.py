@@ -1,47 +1,145 @@
 import asyncio
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from quantum_qe_core.skills.dom_extractor import DomExtractor, simplify_html
+from quantum_qe_core.skills.dom_serializer import DomSerializer
+from quantum_qe_core.skills.screenshot_store import ScreenshotStore, Frame
+from quantum_qe_core.skills.capture import CaptureBuffer, ResponseLog
+from quantum_qe_core.skills.passive import PassivePipeline
+from quantum_qe_core.skills.sensitive_data import is_text_content
+from quantum_qe_core.tracing import span, traced, text_bytes
 from langchain_core.tools import Tool
-import uuid
 import os
+import time
+
+# Requests that stay open by design never count against settling: event streams outright,
+# anything else (long polls, streaming fetches) once it has been open this long
+STREAMING_RESOURCE_TYPES = ("eventsource", "websocket")
+LONG_REQUEST_SECONDS = 2.0
+
+# Installs a MutationObserver once per document and returns ms since the last DOM mutation
+MUTATION_IDLE_JS = """
+() => {
+    if (!window.__qeMutations) {
+        window.__qeLastMutation = performance.now();
+        window.__qeMutations = new MutationObserver(() => { window.__qeLastMutation = performance.now(); });
+        window.__qeMutations.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    }
+    return performance.now() - window.__qeLastMutation;
+}
+"""
 
 class BrowserManager:
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, dom_diff: bool = True, token_budget: int = 3000,
+                 screenshot_store: ScreenshotStore = None, vision: bool = False,
+                 log_limit: int = 2000, response_limit: int = 2000, spill_dir: str = None,
+                 background_passive: bool = True, body_limit: int = 2 * 1024 * 1024):
         self.playwright = None
         self.browser = None
         self.page = None
         self.headless = headless
-        self.logs = []
-        self.responses = []
+        # Bounded capture; evicted records go to gzip JSONL under spill_dir when set
+        spill_prefix = os.path.join(spill_dir, f"capture_{id(self):x}") if spill_dir else None
+        self.logs = CaptureBuffer(log_limit, spill_prefix and spill_prefix + "_logs.jsonl.gz")
+        self.responses = ResponseLog(response_limit, spill_prefix and spill_prefix + "_responses.jsonl.gz")
+        # Header/cookie/sensitive-data rules run while navigating, not when the Auditor asks
+        self.passive = PassivePipeline() if background_passive else None
+        self.body_limit = body_limit # Larger (or binary) bodies are not scanned for secrets
+        self.dom_extractor = DomExtractor()
+        self.dom_diff = dom_diff # Send only DOM changes between consecutive observations
+        self.last_snapshot = None
+        # Full snapshots are ranked and cut to this many tokens (None = unbounded)
+        self.dom_serializer = DomSerializer(token_budget) if token_budget else None
+        self.instruction_hint = ""
+        self.last_serialization_report = None
+        self.owns_page = False # True for clones, whose page is closed with the manager
+        # Settle detection state, fed by the page hooks
+        self._inflight = {} # request -> time it started
+        self.last_network_activity = 0.0
+        self.last_navigation = 0.0
+        self.settle_metrics = []
+        # Report screenshots are deduplicated and downscaled here (shareable across managers)
+        self.screenshot_store = screenshot_store or ScreenshotStore()
+        self.vision = vision # Attach the observation frame (base64) for multimodal models
+        self.last_frame = None
 
     async def start(self):
         """Initializes the browser instance."""
-        if not self.playwright:
+        if not self.playwright and not self.page:
             self.playwright = await async_playwright().start()
             self.browser = await self.playwright.chromium.launch(headless=self.headless)
-            self.page = await self.browser.new_page()
-            
-            # Capture console logs
-            self.page.on("console", lambda msg: self.logs.append(f"[CONSOLE] {msg.type}: {msg.text}"))
-            
-            # Capture failed network requests
-            self.page.on("requestfailed", lambda request: self.logs.append(f"[NETWORK] Failed: {request.url} - {request.failure}"))
-
-            # Capture all network responses for security analysis
-            async def handle_response(response):
-                try:
-                    headers = await response.all_headers()
-                    self.responses.append({
-                        "url": response.url,
-                        "status": response.status,
-                        "headers": headers
-                    })
-                except Exception as e:
-                    pass # Ignore errors during capture to avoid noise
-
-            self.page.on("response", handle_response)
-
-    async def navigate(self, url: str) -> dict:
+            self.attach(await self.browser.new_page())
+
+    def attach(self, page):
+        """Binds this manager to a page and installs the capture hooks.
+
+        Used directly by BrowserPool for pages that live in a shared browser;
+        such managers own neither the browser nor the page.
+        """
+        self.page = page
+        
+        # Capture console logs
+        self.page.on("console", lambda msg: self.logs.append(f"[CONSOLE] {msg.type}: {msg.text}"))
+        
+        # Track in-flight requests and main-frame navigations for wait_for_settle
+        def handle_request(request):
+            self.last_network_activity = time.monotonic()
+            if request.resource_type not in STREAMING_RESOURCE_TYPES:
+                self._inflight[request] = self.last_network_activity
+
+        def request_done(request):
+            # "response" fires when headers arrive; a request is done once its body is
+            self._inflight.pop(request, None)
+            self.last_network_activity = time.monotonic()
+
+        def handle_navigation(frame):
+            if frame == self.page.main_frame:
+                self.last_navigation = time.monotonic()
+
+        self.page.on("request", handle_request)
+        self.page.on("requestfinished", request_done)
+        self.page.on("framenavigated", handle_navigation)
+
+        # Capture failed network requests
+        def handle_request_failed(request):
+            request_done(request)
+            self.logs.append(f"[NETWORK] Failed: {request.url} - {request.failure}")
+
+        self.page.on("requestfailed", handle_request_failed)
+
+        # Capture all network responses for security analysis
+        async def handle_response(response):
+            self.last_network_activity = time.monotonic()
+            try:
+                headers = await response.all_headers()
+                record = {
+                    "url": response.url,
+                    "status": response.status,
+                    "headers": headers,
+                    "resource_type": response.request.resource_type
+                }
+                self.responses.append(record)
+                if self.passive:
+                    # The body only travels through the analysis queue, never into the ring buffer
+                    self.passive.submit(dict(record, body=await self._text_body(response, headers)))
+            except Exception as e:
+                pass # Ignore errors during capture to avoid noise
+
+        self.page.on("response", handle_response)
+
+    async def _text_body(self, response, headers: dict) -> bytes:
+        if not is_text_content(headers.get("content-type", "")) or not 200 <= response.status < 300:
+            return None
+        length = headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.body_limit:
+            return None
+        try:
+            body = await response.body()
+        except Exception:
+            return None # Redirects and evicted resources have no body
+        return body[:self.body_limit]
+
+    @traced("browser/navigate", "browser", measure=text_bytes)
+    async def navigate(self, url: str, capture: bool = None) -> dict:
         """Navigates to a specific URL and returns the simplified DOM."""
         if not self.page:
             await self.start()
@@ -52,9 +150,9 @@ class BrowserManager:
         except Exception as e:
             error_msg = f"Navigation failed: {str(e)}"
             self.logs.append(f"[ERROR] {error_msg}")
-            return {"text": f"Error: {error_msg}", "image": None}
+            return {"text": f"Error: {error_msg}", "image": None, "frame": None}
             
-        return await self.get_simplified_dom()
+        return await self.get_simplified_dom(capture=capture)
 
     async def get_url(self) -> str:
         """Returns the current URL."""
@@ -62,6 +160,7 @@ class BrowserManager:
              return self.page.url
         return "No Page Open"
 
+    @traced("browser/click", "browser")
     async def click_element(self, selector: str) -> str:
         """Clicks an element based on a CSS selector."""
         if not self.page:
@@ -83,6 +182,7 @@ class BrowserManager:
             except Exception as e_js:
                 return f"Failed to click element: {str(e_click)}. JS Fallback also failed: {str(e_js)}"
 
+    @traced("browser/type", "browser")
     async def type_text(self, selector: str, text: str) -> str:
         """Types text into an element based on a CSS selector."""
         if not self.page:
@@ -93,6 +193,7 @@ class BrowserManager:
         except Exception as e:
             return f"Failed to type text: {str(e)}"
 
+    @traced("browser/press_key", "browser")
     async def press_key(self, selector: str, key: str) -> str:
         """Presses a specific key on an element."""
         if not self.page:
@@ -103,96 +204,208 @@ class BrowserManager:
         except Exception as e:
             return f"Failed to press key: {str(e)}"
 
-    async def get_simplified_dom(self) -> dict:
-        """Returns a simplified version of the DOM for the LLM and a screenshot."""
+    def set_instruction_hint(self, hint: str):
+        """Sets the current instruction, used to rank elements by relevance."""
+        self.instruction_hint = hint or ""
+
+    @property
+    def inflight_requests(self) -> int:
+        """Requests that still hold up settling (see wait_for_settle)."""
+        now = time.monotonic()
+        return sum(1 for started in self._inflight.values() if now - started < LONG_REQUEST_SECONDS)
+
+    async def wait_for_settle(self, timeout: float = 10.0, quiet_ms: int = 300, label: str = "settle") -> float:
+        """Waits until the page is quiet instead of sleeping a fixed amount.
+
+        The page is settled when no request is in flight (event streams, and requests
+        open longer than LONG_REQUEST_SECONDS such as long polls, are ignored), no
+        network event or main-frame navigation happened for `quiet_ms`, and the DOM
+        has not mutated for `quiet_ms`.
+        Gives up after `timeout` seconds. Returns the time waited and records it in
+        settle_metrics.
+        """
         if not self.page:
-            return {"text": "", "image": None}
+            return 0.0
+        with span(f"settle/{label}", "browser") as args:
+            elapsed, settled = await self._settle(timeout, quiet_ms)
+            args["settled"] = settled
+        self.settle_metrics.append({"label": label, "seconds": elapsed, "settled": settled})
+        if not settled:
+            self.logs.append(f"[SETTLE] {label}: page still busy after {timeout}s ({self.inflight_requests} requests in flight)")
+        return elapsed
+
+    async def _settle(self, timeout: float, quiet_ms: int):
+        quiet = quiet_ms / 1000
+        start = time.monotonic()
+        deadline = start + timeout
+        settled = False
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            try:
+                if now - self.last_navigation < quiet:
+                    # A navigation just committed: let the new document parse first
+                    await self.page.wait_for_load_state("domcontentloaded", timeout=(deadline - now) * 1000)
+                dom_idle_ms = await self.page.evaluate(MUTATION_IDLE_JS)
+            except Exception:
+                dom_idle_ms = 0 # Execution context destroyed mid-navigation
+            now = time.monotonic()
+            if (self.inflight_requests == 0
+                    and now - self.last_network_activity >= quiet
+                    and now - self.last_navigation >= quiet
+                    and dom_idle_ms >= quiet_ms):
+                settled = True
+                break
+            await asyncio.sleep(0.05)
+
+        return time.monotonic() - start, settled
+
+    def get_settle_stats(self) -> dict:
+        """Summarizes time spent waiting for the page to settle, per label."""
+        stats = {}
+        for metric in self.settle_metrics:
+            entry = stats.setdefault(metric["label"], {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "timeouts": 0})
+            entry["count"] += 1
+            entry["total_seconds"] += metric["seconds"]
+            entry["max_seconds"] = max(entry["max_seconds"], metric["seconds"])
+            if not metric["settled"]:
+                entry["timeouts"] += 1
+        for entry in stats.values():
+            entry["avg_seconds"] = entry["total_seconds"] / entry["count"]
+        return stats
+
+    @traced("browser/screenshot", "browser", measure=lambda frame: {"bytes": len(frame.data)})
+    async def capture_frame(self) -> Frame:
+        """Takes one JPEG screenshot of the current page and remembers it as the latest frame."""
+        self.last_frame = Frame(await self.page.screenshot(type="jpeg"), self.page.url)
+        return self.last_frame
+
+    @traced("dom/extract", "dom", measure=text_bytes)
+    async def get_simplified_dom(self, diff: bool = False, hint: str = "", capture: bool = None) -> dict:
+        """Returns a simplified version of the DOM for the LLM and, optionally, a screenshot.
+
+        With diff=True only the elements added, removed or changed since the previous
+        observation are rendered; a full snapshot is returned when there is no
+        comparable baseline (first call or a new document) or when the diff is
+        larger than the serializer's token budget.
+
+        A frame is captured when `capture` is set (default: only in vision mode) and
+        returned under "frame" for the reporter to reuse; "image" carries its base64
+        form only in vision mode.
+        """
+        if not self.page:
+            return {"text": "", "image": None, "frame": None, "elements": []}
         
         try:
-            # Capture screenshot
-            screenshot_bytes = await self.page.screenshot(type="jpeg")
-            import base64
-            screenshot_b64 = base64.b64encode(screenshot_bytes).decode("utf-8")
+            frame = await self.capture_frame() if (self.vision if capture is None else capture) else None
             
-            content = await self.page.content()
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "noscript", "svg"]):
-                script.decompose()
-
-            # Simplify structure - focusing on interactive elements
-            interactive_elements = []
-            # Improved selector list to include more semantic elements
-            for tag in soup.find_all(['a', 'button', 'input', 'select', 'textarea', 'form', 'div', 'span', 'li', 'ul', 'h1', 'h2', 'h3']):
-                 # Basic attributes
-                 attrs = []
-                 if tag.get('id'): attrs.append(f"id='{tag['id']}'")
-                 if tag.get('name'): attrs.append(f"name='{tag['name']}'")
-                 if tag.get('class'): attrs.append(f"class='{' '.join(tag['class'])}'")
-                 if tag.get('placeholder'): attrs.append(f"placeholder='{tag['placeholder']}'")
-                 if tag.get('href'): attrs.append(f"href='{tag['href']}'")
-                 if tag.get('type'): attrs.append(f"type='{tag['type']}'")
-                 if tag.get('onclick'): attrs.append(f"onclick='{tag['onclick']}'") # Crucial for some frameworks
-                 
-                 # Robust attributes (Testing & Accessibility)
-                 for attr in ['data-testid', 'data-test-id', 'data-cy', 'aria-label', 'role', 'title']:
-                     if tag.get(attr):
-                         attrs.append(f"{attr}='{tag[attr]}'")
-
-                 # Only include generic containers if they have relevant attributes
-                 if tag.name in ['div', 'span', 'li', 'ul', 'h1', 'h2', 'h3']:
-                     if not any(k in tag.attrs for k in ['id', 'data-testid', 'data-test-id', 'data-cy', 'role', 'onclick', 'class']):
-                         continue
-
-                 text = tag.get_text(strip=True)
-                 if not text and not attrs:
-                     continue # Skip empty elements without attributes
-                     
-                 attr_str = " ".join(attrs)
-                 
-                 interactive_elements.append(f"<{tag.name} {attr_str}>{text}</{tag.name}>")
-
-            # Also get text content for context, but limit it
-            body_text = soup.body.get_text(separator=' ', strip=True)[:1000] if soup.body else ""
+            try:
+                # One JS pass over the live DOM instead of shipping page.content() back for parsing
+                snapshot = await self.dom_extractor.extract(self.page)
+            except Exception as e:
+                self.logs.append(f"[ERROR] In-page DOM extraction failed, falling back to HTML parsing: {str(e)}")
+                snapshot = simplify_html(await self.page.content())
             
-            context_text = f"Page Context:\n{body_text}\n\nInteractive Elements:\n" + "\n".join(interactive_elements)
+            previous, self.last_snapshot = self.last_snapshot, snapshot
+            delta = self.dom_extractor.diff(previous, snapshot) if diff else None
+            text = self.dom_extractor.render_diff(snapshot, delta) if delta is not None else None
+            if (text is not None and self.dom_serializer
+                    and self.dom_serializer.count_tokens(text) > self.dom_serializer.token_budget):
+                # Large change (route change, infinite scroll): a ranked full snapshot fits the budget, the diff does not
+                text = None
+            if text is None and self.dom_serializer:
+                text, report = self.dom_serializer.serialize(
+                    snapshot, f"{self.instruction_hint} {hint}", show_ids=self.dom_diff)
+                self.last_serialization_report = report
+                print(f"[DEBUG] DOM serialized: {report['elements_emitted']}/{report['elements_total']} elements, "
+                      f"{report['tokens_emitted']} tokens ({report['tokens_saved']} saved)")
+            elif text is None:
+                text = self.dom_extractor.render(snapshot, show_ids=self.dom_diff)
             
             return {
-                "text": context_text,
-                "image": screenshot_b64
+                "text": text,
+                "image": frame.base64 if frame and self.vision else None,
+                "frame": frame,
+                "elements": snapshot.get("elements", [])
             }
         except Exception as e:
             error_msg = f"Failed to get DOM/Screenshot: {str(e)}"
             self.logs.append(f"[ERROR] {error_msg}")
-            return {"text": f"Error: {error_msg}", "image": None}
+            return {"text": f"Error: {error_msg}", "image": None, "frame": None, "elements": []}
 
     async def take_screenshot(self, filename: str):
         """Saves a screenshot to a file."""
         if self.page:
             await self.page.screenshot(path=filename)
 
+    async def record_step(self, reporter, description: str, status: str = "PASS", frame: Frame = None):
+        """Adds a report step whose screenshot goes through the shared screenshot store.
+
+        Pass the frame of the observation that just happened to avoid a second capture.
+        """
+        screenshot_path = None
+        if self.page:
+            try:
+                frame = frame or await self.capture_frame()
+                screenshot_path = await self.screenshot_store.add(frame.data)
+            except Exception as e:
+                self.logs.append(f"[ERROR] Failed to store screenshot: {str(e)}")
+        reporter.add_step(description, status, screenshot_path)
+
+    @traced("browser/content", "browser", measure=text_bytes)
     async def get_content(self) -> str:
         """Returns the raw HTML content of the page."""
         if self.page:
             return await self.page.content()
         return ""
 
+    async def clone(self) -> "BrowserManager":
+        """Opens the current URL in a new page of the same context.
+
+        The clone shares cookies and localStorage with this page, gets a copy of its
+        sessionStorage, and can be driven independently (e.g. by parallel scan workers).
+        """
+        if not self.page:
+            raise RuntimeError("Browser not started.")
+        session_storage = await self.page.evaluate("() => JSON.stringify(Object.assign({}, sessionStorage))")
+        page = await self.page.context.new_page()
+        await page.add_init_script(
+            "(() => { const s = %s; for (const k in s) sessionStorage.setItem(k, s[k]); })()" % session_storage)
+
+        worker = BrowserManager(headless=self.headless, dom_diff=False, token_budget=None,
+                                screenshot_store=self.screenshot_store, background_passive=False)
+        worker.attach(page)
+        worker.owns_page = True
+        await page.goto(self.page.url, timeout=30000)
+        return worker
+
     async def close(self):
-        """Closes the browser."""
+        """Closes the browser (no-op for pooled managers, the pool owns the browser)."""
+        if self.owns_page and self.page:
+            await self.page.close()
+        if self.passive:
+            await self.passive.stop()
+        self.logs.close()
+        self.responses.close()
         if self.browser:
             await self.browser.close()
+            self.screenshot_store.close()
         if self.playwright:
             await self.playwright.stop()
 
     async def get_logs(self):
-        """Returns captured browser logs."""
-        return self.logs
+        """Returns captured browser logs (the newest `log_limit` lines)."""
+        return list(self.logs)
         
     async def get_responses(self):
         """Returns captured network responses."""
         return getattr(self, 'responses', [])
 
+    async def get_responses_for(self, url: str) -> list:
+        """Returns captured responses for a URL via the per-URL index."""
+        return self.responses.find(url)
+
     async def get_cookies(self):
         """Returns all cookies from the current context."""
         if self.page:
@@ -248,32 +461,32 @@ class BrowserManager:
         """Returns a list of LangChain Tools exposed by this skill."""
         
         # Redefine navigate wrapper to match original structure but cleaner
+        @traced("tool/Navigate", "tool")
         async def navigate_wrapper(url: str):
              print(f"[DEBUG] navigate_wrapper called with {url}")
-             result = await self.navigate(url)
+             result = await self.navigate(url, capture=True if reporter else None)
              if reporter:
-                step_uuid = str(uuid.uuid4())[:8]
-                filename = f"output/report_screenshots/step_{len(reporter.steps)}_{step_uuid}.jpg"
-                os.makedirs("output/report_screenshots", exist_ok=True)
-                await self.take_screenshot(filename)
-                reporter.add_step(f"Navigated to {url}", "PASS", filename)
+                await self.record_step(reporter, f"Navigated to {url}", "PASS", result.get("frame"))
              
              if isinstance(result, dict):
                 return result.get("text", "No content")
              return result
 
+        @traced("tool/ClickElement", "tool")
         async def click_wrapper(selector: str):
             print(f"[DEBUG] click_wrapper received: {selector}")
             result = await self.click_element(selector)
+            await self.wait_for_settle(label="click")
+            # One observation per step: its frame also becomes the report screenshot
+            changes = await self.get_simplified_dom(diff=True, capture=True if reporter else None) if self.dom_diff else {}
             if reporter:
                 status = "PASS" if "Successfully" in result else "FAIL"
-                step_uuid = str(uuid.uuid4())[:8]
-                filename = f"output/report_screenshots/step_{len(reporter.steps)}_{step_uuid}.jpg"
-                os.makedirs("output/report_screenshots", exist_ok=True)
-                await self.take_screenshot(filename)
-                reporter.add_step(f"Clicked {selector}. Result: {result}", status, filename)
+                await self.record_step(reporter, f"Clicked {selector}. Result: {result}", status, changes.get("frame"))
+            if self.dom_diff:
+                return f"{result}\n\n{changes['text']}"
             return result
 
+        @traced("tool/TypeText", "tool")
         async def type_wrapper(input_str: str):
             print(f"[DEBUG] type_wrapper received: {input_str}")
             try:
@@ -286,17 +499,20 @@ class BrowserManager:
             except Exception as e:
                 return f"Error processing input '{input_str}': {e}"
             
+            changes = await self.get_simplified_dom(diff=True, capture=True if reporter else None) if self.dom_diff else {}
             if reporter:
                  status = "PASS" if "Successfully" in result else "FAIL"
-                 step_uuid = str(uuid.uuid4())[:8]
-                 filename = f"output/report_screenshots/step_{len(reporter.steps)}_{step_uuid}.jpg"
-                 os.makedirs("output/report_screenshots", exist_ok=True)
-                 await self.take_screenshot(filename)
-                 reporter.add_step(f"Typed '{text}' into {selector}", status, filename)
+                 await self.record_step(reporter, f"Typed '{text}' into {selector}", status, changes.get("frame"))
+            if self.dom_diff:
+                return f"{result}\n\n{changes['text']}"
             return result
 
+        @traced("tool/GetPageContext", "tool")
         async def get_context_wrapper(x):
-            result = await self.get_simplified_dom()
+            # 'full' forces a complete snapshot; otherwise only changes are sent in diff mode
+            query = x.strip() if isinstance(x, str) else ""
+            full = query.lower() == "full"
+            result = await self.get_simplified_dom(diff=self.dom_diff and not full, hint="" if full else query)
             if isinstance(result, dict):
                  return result.get("text", "")
             return result
@@ -324,6 +540,6 @@ class BrowserManager:
                 name="GetPageContext",
                 func=get_context_wrapper,
                 coroutine=get_context_wrapper,
-                description="Refreshes page view."
+                description="Refreshes page view. Returns only changes since the last view; input 'full' for the whole page, or keywords to prioritise matching elements."
             )
         ]
@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from quantum_qe_core.skills.browser import BrowserManager
+from quantum_qe_core.skills.screenshot_store import ScreenshotStore
+
+
+class BrowserPool:
+    """One Chromium process shared by many isolated BrowserContexts.
+
+    Sessions lease a context through `lease()`, which yields a BrowserManager bound
+    to a page in a new context; the context is closed when the lease ends. Contexts
+    are never reused: clearing cookies alone would leave localStorage,
+    sessionStorage, IndexedDB, the HTTP cache and service workers (and with them
+    auth tokens) to the next session, while a new context costs only milliseconds
+    next to the browser launch the pool saves. At most `max_contexts` leases are
+    active at once.
+    """
+
+    def __init__(self, headless: bool = False, max_contexts: int = 4, **manager_options):
+        self.headless = headless
+        self.max_contexts = max_contexts
+        self.manager_options = manager_options # Forwarded to each leased BrowserManager
+        # One store for every lease, so identical frames across sessions are written once
+        self.screenshot_store = manager_options.setdefault("screenshot_store", ScreenshotStore())
+        self.playwright = None
+        self.browser = None
+        self._semaphore = asyncio.Semaphore(max_contexts)
+        self._lock = asyncio.Lock()
+        self.stats = {"leases": 0, "contexts_created": 0, "relaunches": 0}
+
+    async def start(self):
+        """Launches the shared browser."""
+        if not self.playwright:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=self.headless)
+
+    async def _close_context(self, context):
+        try:
+            await context.close()
+        except Exception:
+            pass # Context may already be gone with a crashed browser
+
+    async def _new_context(self):
+        async with self._lock:
+            if not self.browser or not self.browser.is_connected():
+                # Browser crashed: relaunch it
+                if self.playwright:
+                    self.stats["relaunches"] += 1
+                    try:
+                        await self.playwright.stop()
+                    except Exception:
+                        pass
+                self.playwright = None
+                await self.start()
+        self.stats["contexts_created"] += 1
+        return await self.browser.new_context()
+
+    @asynccontextmanager
+    async def lease(self):
+        """Leases an isolated context for one Navigator/Auditor session."""
+        async with self._semaphore:
+            await self.start()
+            context = await self._new_context()
+            self.stats["leases"] += 1
+            manager = BrowserManager(headless=self.headless, **self.manager_options)
+            try:
+                manager.attach(await context.new_page())
+                yield manager
+            finally:
+                try:
+                    await manager.close() # Stops its background tasks; the pool keeps the browser
+                finally:
+                    await self._close_context(context) # Even if the page was already gone
+
+    async def close(self):
+        """Closes the shared browser (and with it any context still leased)."""
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+        self.browser = None
+        self.playwright = None
+        self.screenshot_store.close()
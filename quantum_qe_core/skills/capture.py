@@ -0,0 +1,103 @@
+import os
+import gzip
+import json
+from collections import deque, defaultdict
+from typing import List, Dict, Any
+from urllib.parse import urldefrag
+
+
+class CaptureBuffer:
+    """Ring buffer for captured browser events.
+
+    Keeps the newest `maxlen` records in memory. Records pushed out of the ring are
+    either dropped (counted in `dropped`) or, when `spill_path` is set, appended to
+    a gzip-compressed JSONL file for later analysis.
+    """
+
+    def __init__(self, maxlen: int = 2000, spill_path: str = None):
+        if maxlen < 1:
+            # Checked here: append() runs inside page event handlers, where an error would only be swallowed
+            raise ValueError(f"CaptureBuffer maxlen must be at least 1, got {maxlen}")
+        self.maxlen = maxlen
+        self.spill_path = spill_path
+        self.dropped = 0
+        self._items = deque()
+        self._spill = None
+
+    def append(self, record):
+        if len(self._items) >= self.maxlen:
+            self._evict(self._items.popleft())
+        self._items.append(record)
+
+    def _evict(self, record):
+        if self.spill_path:
+            if self._spill is None:
+                os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+                self._spill = gzip.open(self.spill_path, "at", encoding="utf-8")
+            self._spill.write(json.dumps(record, separators=(",", ":")) + "\n")
+        else:
+            self.dropped += 1
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._items)[index]
+        return self._items[index]
+
+    def close(self):
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+
+class ResponseLog(CaptureBuffer):
+    """CaptureBuffer of responses with an index by URL (fragment stripped).
+
+    The index only references records still in the ring, so lookups cost the
+    number of distinct URLs at worst, not the number of captured responses.
+    Each record gets a sequence number ("seq") so consumers can read incrementally.
+    """
+
+    def __init__(self, maxlen: int = 2000, spill_path: str = None):
+        super().__init__(maxlen, spill_path)
+        self._by_url = defaultdict(deque)
+        self.appended = 0
+
+    def append(self, record: Dict[str, Any]):
+        record["seq"] = self.appended
+        self.appended += 1
+        super().append(record)
+        self._by_url[urldefrag(record["url"])[0]].append(record)
+
+    def _evict(self, record):
+        key = urldefrag(record["url"])[0]
+        entries = self._by_url[key]
+        entries.popleft() # The ring evicts oldest first, so it is also the oldest for its URL
+        if not entries:
+            del self._by_url[key]
+        super()._evict(record)
+
+    def since(self, seq: int) -> List[Dict[str, Any]]:
+        """Records with seq >= `seq` that are still in the ring, oldest first."""
+        fresh = []
+        for record in reversed(self._items):
+            if record["seq"] < seq:
+                break
+            fresh.append(record)
+        fresh.reverse()
+        return fresh
+
+    def urls(self) -> List[str]:
+        return list(self._by_url)
+
+    def find(self, url: str) -> List[Dict[str, Any]]:
+        """Responses for `url`: exact match first, else every URL containing it."""
+        key = urldefrag(url)[0]
+        if key in self._by_url:
+            return list(self._by_url[key])
+        return [record for candidate, entries in self._by_url.items() if url in candidate for record in entries]
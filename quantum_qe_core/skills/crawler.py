@@ -0,0 +1,275 @@
+import re
+import heapq
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Iterable, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from quantum_qe_core.skills.passive import origin_of
+from quantum_qe_core.tracing import span
+
+# Links that end the session or change data are never followed
+DEFAULT_EXCLUDE = [r"log-?out", r"sign-?out", r"/delete", r"/remove", r"/destroy"]
+SKIPPED_EXTENSIONS = (".pdf", ".zip", ".gz", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico",
+                      ".css", ".js", ".mp4", ".mp3", ".woff", ".woff2", ".exe", ".dmg")
+SKIPPED_SCHEMES = ("javascript:", "mailto:", "tel:", "data:", "blob:")
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|_ga|ref)$", re.I)
+# Links whose URL or text mentions one of these are crawled earlier
+INTERESTING = re.compile(r"login|sign-?in|admin|account|profile|search|upload|settings|register|contact|api", re.I)
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f-]{27}|[0-9a-f]{24,})$", re.I)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for frontier deduplication.
+
+    Lowercases scheme and host, drops the fragment, default ports and tracking
+    parameters, and sorts the query.
+    """
+    parts = urlsplit(url)
+    scheme, host = parts.scheme.lower(), (parts.hostname or "").lower()
+    netloc = host if parts.port in (None, 80 if scheme == "http" else 443) else f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_template(url: str) -> str:
+    """Normalized URL with ID-like path segments and query values abstracted (/item/42?id=7 -> /item/{id}?id)."""
+    parts = urlsplit(normalize_url(url))
+    path = "/".join("{id}" if ID_SEGMENT.match(segment) else segment for segment in parts.path.split("/"))
+    keys = "&".join(sorted({k for k, _ in parse_qsl(parts.query, keep_blank_values=True)}))
+    return urlunsplit((parts.scheme, parts.netloc, path, keys, ""))
+
+
+def state_fingerprint(url: str, snapshot: Dict[str, Any]) -> str:
+    """Identifies equivalent page states: URL template plus the structure (not the text) of the DOM.
+
+    Elements are reduced to tag, type, name and role; runs of identical tokens are
+    collapsed so a list of 10 or 50 products has the same structure.
+    """
+    tokens = []
+    for element in snapshot.get("elements", []):
+        attrs = element.get("attrs", {})
+        token = f"{element['tag']}:{attrs.get('type', '')}:{attrs.get('name', '')}:{attrs.get('role', '')}"
+        if not tokens or tokens[-1] != token:
+            tokens.append(token)
+    payload = url_template(url) + "\n" + "\n".join(tokens)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def extract_links(snapshot: Dict[str, Any], base_url: str) -> List[Dict[str, str]]:
+    """Absolute http(s) links from the anchors of a DOM snapshot, with their text."""
+    links, seen = [], set()
+    for element in snapshot.get("elements", []):
+        href = element.get("attrs", {}).get("href") if element.get("tag") == "a" else None
+        if not href or href.startswith("#") or href.lower().startswith(SKIPPED_SCHEMES):
+            continue
+        url = urljoin(snapshot.get("url") or base_url, href)
+        if urlsplit(url).scheme in ("http", "https") and url not in seen:
+            seen.add(url)
+            links.append({"url": url, "text": element.get("text", "")})
+    return links
+
+
+async def scan_page(auditor, worker, url: str, snapshot: Dict[str, Any], cursor: int = 0, active: str = None) -> int:
+    """Runs the SecurityAuditor's checks on a worker's current page. Returns the worker's new response cursor.
+
+    Responses since `cursor` feed the auditor's own analyzer, so header findings
+    aggregate per origin across workers. Forms are fuzzed with active="http" or
+    "browser".
+    """
+    for record in worker.responses.since(cursor):
+        auditor.passive.add(record)
+    auditor.scan_passive()
+    cursor = worker.responses.appended
+    auditor.scan_cookies(await worker.get_cookies())
+    auditor.scan_sensitive_data(await worker.get_content(), url)
+
+    has_form = any(e["tag"] in ("form", "input", "textarea") for e in snapshot.get("elements", []))
+    if has_form and active == "http":
+        await auditor.http_scan(worker)
+    elif has_form and active == "browser":
+        await auditor.active_scan(worker, concurrency=1)
+    return cursor
+
+
+class CrawlScope:
+    """Which URLs the crawler may visit: allowed origins, include/exclude regexes and a depth limit."""
+
+    def __init__(self, origins: Iterable[str], include: List[str] = None, exclude: List[str] = None,
+                 max_depth: int = 3):
+        self.origins = {origin_of(normalize_url(o)) for o in origins}
+        self.include = [re.compile(p, re.I) for p in include or []]
+        self.exclude = [re.compile(p, re.I) for p in (DEFAULT_EXCLUDE if exclude is None else exclude)]
+        self.max_depth = max_depth
+
+    @classmethod
+    def for_urls(cls, urls: Iterable[str], **kwargs) -> "CrawlScope":
+        return cls([origin_of(u) for u in urls], **kwargs)
+
+    def allows(self, url: str, depth: int = 0) -> bool:
+        if depth > self.max_depth or origin_of(url) not in self.origins:
+            return False
+        if urlsplit(url).path.lower().endswith(SKIPPED_EXTENSIONS):
+            return False
+        if self.include and not any(p.search(url) for p in self.include):
+            return False
+        return not any(p.search(url) for p in self.exclude)
+
+
+class UrlFrontier:
+    """Priority queue of URLs to visit, deduplicated by normalized URL.
+
+    Lower scores come first: shallow pages, then links that look interesting
+    (login, admin, search ...); query-string variants are pushed back.
+    """
+
+    def __init__(self, scope: CrawlScope):
+        self.scope = scope
+        self._heap = []
+        self._seen = set()
+        self._seq = 0
+
+    @staticmethod
+    def score(url: str, depth: int, text: str = "") -> float:
+        score = depth * 10.0
+        if INTERESTING.search(url) or INTERESTING.search(text or ""):
+            score -= 5
+        if urlsplit(url).query:
+            score += 3
+        return score
+
+    def push(self, url: str, depth: int, text: str = "", parent: str = None) -> bool:
+        key = normalize_url(url)
+        if key in self._seen or not self.scope.allows(key, depth):
+            return False
+        self._seen.add(key)
+        self._seq += 1
+        heapq.heappush(self._heap, (self.score(key, depth, text), self._seq, key, depth, parent))
+        return True
+
+    def pop(self) -> Optional[tuple]:
+        """(url, depth, parent) of the best pending URL, or None."""
+        if not self._heap:
+            return None
+        _, _, url, depth, parent = heapq.heappop(self._heap)
+        return url, depth, parent
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class Crawler:
+    """Explores an application from start URLs and feeds every new page state to the scanners.
+
+    Pages come either from a BrowserPool (one isolated context per worker) or as
+    clones of a live BrowserManager, which share its cookies (e.g. a logged-in
+    session left by the Navigator). Up to `concurrency` pages are crawled at a
+    time. A page whose state fingerprint was already seen is not expanded or
+    scanned again. New states get the passive header/cookie checks, a
+    secrets/PII scan of their HTML and, with active="http" or "browser", form
+    fuzzing through the SecurityAuditor.
+    """
+
+    def __init__(self, auditor, scope: CrawlScope, pool=None, browser=None, max_pages: int = 50,
+                 concurrency: int = 3, active: str = None, nav_timeout: float = 30.0):
+        if pool is None and browser is None:
+            raise ValueError("Crawler needs a BrowserPool or a BrowserManager to take pages from")
+        self.auditor = auditor
+        self.scope = scope
+        self.pool = pool
+        self.browser = browser
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.active = active
+        self.nav_timeout = nav_timeout
+        self.frontier = UrlFrontier(scope)
+        self.states = {} # fingerprint -> first page record with that state
+        self.pages = []
+        self.stats = {"visited": 0, "duplicates": 0, "errors": 0, "findings": 0}
+        self._busy = 0
+
+    @asynccontextmanager
+    async def _worker_page(self):
+        if self.pool:
+            async with self.pool.lease() as worker:
+                yield worker
+        else:
+            worker = await self.browser.clone()
+            try:
+                yield worker
+            finally:
+                await worker.close()
+
+    async def crawl(self, start_urls: Iterable[str]) -> List[Dict[str, Any]]:
+        """Crawls until the frontier is exhausted or max_pages were visited. Returns one record per page."""
+        for url in start_urls:
+            self.frontier.push(url, 0)
+        workers = max(1, min(self.concurrency, self.max_pages))
+        with span("crawl", "scan", pages=self.max_pages):
+            await asyncio.gather(*[self._worker() for _ in range(workers)])
+        print(f"[CRAWL] {self.stats['visited']} pages, {len(self.states)} distinct states, "
+              f"{self.stats['duplicates']} duplicates, {self.stats['errors']} errors, {self.stats['findings']} new findings")
+        return self.pages
+
+    def _next(self) -> Optional[tuple]:
+        if self.stats["visited"] >= self.max_pages:
+            return None
+        item = self.frontier.pop()
+        if item:
+            self.stats["visited"] += 1
+            self._busy += 1
+        return item
+
+    async def _worker(self):
+        try:
+            async with self._worker_page() as worker:
+                cursor = 0
+                while True:
+                    item = self._next()
+                    if item is None:
+                        if self._busy == 0 or self.stats["visited"] >= self.max_pages:
+                            return
+                        await asyncio.sleep(0.05) # Another worker may still add links
+                        continue
+                    try:
+                        cursor = await self._visit(worker, *item, cursor)
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        self.pages.append({"url": item[0], "depth": item[1], "parent": item[2], "error": str(e)})
+                    finally:
+                        self._busy -= 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"[CRAWL] Worker failed: {e}")
+
+    async def _visit(self, worker, url: str, depth: int, parent: str, cursor: int) -> int:
+        with span("crawl/page", "scan"):
+            await worker.page.goto(url, timeout=self.nav_timeout * 1000)
+            await worker.wait_for_settle(label="crawl")
+            snapshot = await worker.dom_extractor.extract(worker.page)
+        final_url = worker.page.url
+        fingerprint = state_fingerprint(final_url, snapshot)
+        page = {"url": url, "final_url": final_url, "depth": depth, "parent": parent,
+                "title": snapshot.get("title", ""), "fingerprint": fingerprint}
+        self.pages.append(page)
+
+        if fingerprint in self.states or not self.scope.allows(normalize_url(final_url)):
+            # Same state as an earlier page (or redirected out of scope): nothing new to learn
+            page["duplicate_of"] = self.states.get(fingerprint, {}).get("url")
+            self.stats["duplicates"] += 1
+            return cursor
+        self.states[fingerprint] = page
+
+        links = extract_links(snapshot, final_url)
+        page["links"] = len(links)
+        page["queued"] = sum(self.frontier.push(link["url"], depth + 1, link["text"], final_url) for link in links)
+
+        before = len(self.auditor.findings)
+        cursor = await scan_page(self.auditor, worker, final_url, snapshot, cursor, self.active)
+        page["findings"] = len(self.auditor.findings) - before
+        self.stats["findings"] += page["findings"]
+        return cursor
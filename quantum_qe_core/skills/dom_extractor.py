@@ -0,0 +1,224 @@
+from bs4 import BeautifulSoup
+
+# Tags reported to the LLM. Containers are only kept when they carry a hook attribute.
+INTERACTIVE_TAGS = ['a', 'button', 'input', 'select', 'textarea', 'form']
+CONTAINER_TAGS = ['div', 'span', 'li', 'ul', 'h1', 'h2', 'h3']
+CONTAINER_HOOKS = ['id', 'data-testid', 'data-test-id', 'data-cy', 'role', 'onclick', 'class']
+SKIPPED_TAGS = ['script', 'style', 'noscript', 'svg']
+
+# Attribute order matches the original BeautifulSoup serializer
+REPORTED_ATTRS = ['id', 'name', 'class', 'placeholder', 'href', 'type', 'onclick',
+                  'data-testid', 'data-test-id', 'data-cy', 'aria-label', 'role', 'title']
+
+BODY_TEXT_LIMIT = 1000
+ELEMENT_TEXT_LIMIT = 300
+
+# Single pass over the live DOM. Text is accumulated bottom-up and capped per node,
+# so nested containers cost O(nodes * cap) instead of one get_text() per container.
+# Element IDs live in a page-scoped WeakMap so they stay stable across calls
+# without mutating the DOM the application (and our scanners) can observe.
+EXTRACT_DOM_JS = r"""
+(opts) => {
+    const interactive = new Set(opts.interactive);
+    const containers = new Set(opts.containers);
+    const skipped = new Set(opts.skipped);
+    const hooks = opts.hooks;
+    const reported = opts.reported;
+    const textCap = Math.max(opts.textLimit, opts.bodyLimit);
+
+    if (!window.__qeIds) {
+        window.__qeIds = new WeakMap();
+        window.__qeNextId = 0;
+        window.__qeDocId = Date.now().toString(36) + Math.random().toString(36).slice(2, 8);
+    }
+    const qid = (el) => {
+        let id = window.__qeIds.get(el);
+        if (!id) {
+            id = 'e' + (++window.__qeNextId);
+            window.__qeIds.set(el, id);
+        }
+        return id;
+    };
+
+    const cssString = (v) => '"' + v.replace(/\\/g, '\\\\').replace(/"/g, '\\"') + '"';
+    const selectorFor = (el, tag) => {
+        const id = el.getAttribute('id');
+        if (id) return '#' + CSS.escape(id);
+        for (const a of ['data-testid', 'data-test-id', 'data-cy']) {
+            const v = el.getAttribute(a);
+            if (v) return '[' + a + '=' + cssString(v) + ']';
+        }
+        const name = el.getAttribute('name');
+        if (name) return tag + '[name=' + cssString(name) + ']';
+        const label = el.getAttribute('aria-label');
+        if (label) return tag + '[aria-label=' + cssString(label) + ']';
+        return null;
+    };
+    const isVisible = (el) => {
+        if (typeof el.checkVisibility === 'function') return el.checkVisibility();
+        return el.getClientRects().length > 0;
+    };
+
+    const elements = [];
+    const walk = (node) => {
+        if (node.nodeType === Node.TEXT_NODE) {
+            return node.nodeValue.replace(/\s+/g, ' ').trim().slice(0, textCap);
+        }
+        if (node.nodeType !== Node.ELEMENT_NODE) return '';
+        const tag = node.tagName.toLowerCase();
+        if (skipped.has(tag)) return '';
+
+        let record = null;
+        if (interactive.has(tag) || (containers.has(tag) && hooks.some((h) => node.hasAttribute(h)))) {
+            record = { tag: tag, attrs: {}, text: '' };
+            elements.push(record);
+        }
+
+        let text = '';
+        for (let child = node.firstChild; child; child = child.nextSibling) {
+            const part = walk(child);
+            if (part && text.length < textCap) {
+                text = text ? text + ' ' + part : part;
+            }
+        }
+        if (text.length > textCap) text = text.slice(0, textCap);
+
+        if (record) {
+            for (const a of reported) {
+                const v = node.getAttribute(a);
+                if (v) record.attrs[a] = v.replace(/\s+/g, ' ').trim();
+            }
+            record.text = text.slice(0, opts.textLimit);
+            if (!record.text && Object.keys(record.attrs).length === 0) {
+                record.skip = true;
+            } else {
+                record.id = qid(node);
+                record.visible = isVisible(node);
+                record.selector = selectorFor(node, tag);
+            }
+        }
+        return text;
+    };
+
+    const root = document.body || document.documentElement;
+    const bodyText = root ? walk(root).slice(0, opts.bodyLimit) : '';
+    return {
+        doc_id: window.__qeDocId,
+        url: location.href,
+        title: document.title,
+        body_text: bodyText,
+        elements: elements.filter((e) => !e.skip),
+    };
+}
+"""
+
+
+class DomExtractor:
+    """Builds the simplified DOM the agents reason over."""
+
+    def __init__(self, text_limit: int = ELEMENT_TEXT_LIMIT, body_limit: int = BODY_TEXT_LIMIT):
+        self.text_limit = text_limit
+        self.body_limit = body_limit
+
+    async def extract(self, page) -> dict:
+        """Runs the extraction script in the page and returns the structured snapshot."""
+        return await page.evaluate(EXTRACT_DOM_JS, {
+            "interactive": INTERACTIVE_TAGS,
+            "containers": CONTAINER_TAGS,
+            "skipped": SKIPPED_TAGS,
+            "hooks": CONTAINER_HOOKS,
+            "reported": REPORTED_ATTRS,
+            "textLimit": self.text_limit,
+            "bodyLimit": self.body_limit,
+        })
+
+    @staticmethod
+    def render_element(element: dict, show_id: bool = False) -> str:
+        """Serializes one element in the `<tag attr='v'>text</tag>` form the prompts expect."""
+        attr_str = " ".join(f"{k}='{v}'" for k, v in element.get("attrs", {}).items())
+        tag = element["tag"]
+        line = f"<{tag} {attr_str}>{element.get('text', '')}</{tag}>"
+        if show_id and element.get("id"):
+            line = f"[{element['id']}] {line}"
+        return line
+
+    def render(self, snapshot: dict, elements: list = None, show_ids: bool = False) -> str:
+        """Renders a snapshot into the 'Page Context / Interactive Elements' text contract."""
+        if elements is None:
+            elements = snapshot.get("elements", [])
+        lines = [self.render_element(e, show_ids) for e in elements]
+        return f"Page Context:\n{snapshot.get('body_text', '')}\n\nInteractive Elements:\n" + "\n".join(lines)
+
+    @staticmethod
+    def diff(previous: dict, current: dict):
+        """Compares two snapshots of the same document by stable element id.
+
+        Returns None when the snapshots are not comparable (no baseline or a new document).
+        """
+        if not previous or not current.get("doc_id") or previous.get("doc_id") != current.get("doc_id"):
+            return None
+
+        def signature(e):
+            return (e["tag"], tuple(sorted(e.get("attrs", {}).items())), e.get("text", ""), e.get("visible"))
+
+        before = {e["id"]: e for e in previous.get("elements", []) if e.get("id")}
+        after = {e["id"]: e for e in current.get("elements", []) if e.get("id")}
+
+        added = [e for eid, e in after.items() if eid not in before]
+        removed = [e for eid, e in before.items() if eid not in after]
+        changed = [e for eid, e in after.items() if eid in before and signature(e) != signature(before[eid])]
+        return {
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "unchanged": len(after) - len(added) - len(changed),
+            "body_changed": previous.get("body_text") != current.get("body_text"),
+        }
+
+    def render_diff(self, snapshot: dict, delta: dict) -> str:
+        """Renders only what changed since the previous observation."""
+        if not delta["added"] and not delta["removed"] and not delta["changed"] and not delta["body_changed"]:
+            return f"Page Context: no changes since last observation ({snapshot.get('url', '')})."
+
+        sections = [f"Page Context (diff since last observation, {delta['unchanged']} unchanged elements omitted):"]
+        if delta["body_changed"]:
+            sections.append(snapshot.get("body_text", ""))
+        for label, key in [("Added", "added"), ("Removed", "removed"), ("Changed", "changed")]:
+            if delta[key]:
+                sections.append(f"\n{label} Elements:\n" + "\n".join(self.render_element(e, True) for e in delta[key]))
+        return "\n".join(sections)
+
+
+def simplify_html(content: str) -> dict:
+    """Original BeautifulSoup simplification of raw HTML.
+
+    Kept for offline HTML (no live page) and as the baseline in benchmarks/bench_dom_extraction.py.
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(SKIPPED_TAGS):
+        script.decompose()
+
+    elements = []
+    for tag in soup.find_all(INTERACTIVE_TAGS + CONTAINER_TAGS):
+        # Only include generic containers if they have relevant attributes
+        if tag.name in CONTAINER_TAGS:
+            if not any(k in tag.attrs for k in CONTAINER_HOOKS):
+                continue
+
+        attrs = {}
+        for attr in REPORTED_ATTRS:
+            value = tag.get(attr)
+            if value:
+                attrs[attr] = ' '.join(value) if isinstance(value, list) else value
+
+        text = tag.get_text(strip=True)
+        if not text and not attrs:
+            continue # Skip empty elements without attributes
+
+        elements.append({"tag": tag.name, "attrs": attrs, "text": text})
+
+    # Also get text content for context, but limit it
+    body_text = soup.body.get_text(separator=' ', strip=True)[:BODY_TEXT_LIMIT] if soup.body else ""
+    return {"body_text": body_text, "elements": elements}
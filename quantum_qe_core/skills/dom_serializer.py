@@ -0,0 +1,102 @@
+import re
+
+try:
+    import tiktoken
+except ImportError: # Fall back to a chars/4 estimate
+    tiktoken = None
+
+from quantum_qe_core.skills.dom_extractor import DomExtractor, INTERACTIVE_TAGS
+
+TEST_ATTRS = ['data-testid', 'data-test-id', 'data-cy']
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'into', 'then', 'that', 'this', 'from', 'page', 'click',
+    'type', 'enter', 'navigate', 'go', 'to', 'on', 'in', 'of', 'a', 'an', 'as', 'is', 'it',
+}
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _terms(text: str) -> set:
+    return {w for w in WORD_RE.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS}
+
+
+class DomSerializer:
+    """Renders a DOM snapshot within a token budget, keeping the most relevant elements."""
+
+    def __init__(self, token_budget: int = 3000, body_share: float = 0.25, model: str = "gpt-4o"):
+        self.token_budget = token_budget
+        self.body_share = body_share # Fraction of the budget the page text may use
+        self.extractor = DomExtractor()
+        self.encoding = None
+        if tiktoken:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except Exception:
+                self.encoding = None # Encoding files unavailable offline
+
+    def count_tokens(self, text: str) -> int:
+        if self.encoding:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+    def score(self, element: dict, hint_terms: set) -> float:
+        """Ranks an element by interactivity, visibility, test hooks and lexical relevance."""
+        attrs = element.get("attrs", {})
+        score = 3.0 if element["tag"] in INTERACTIVE_TAGS else 1.0
+        if attrs.get("role") or attrs.get("onclick"):
+            score += 1.0
+        if element.get("visible") is True:
+            score += 2.0
+        elif element.get("visible") is False:
+            score -= 2.0
+        if any(attrs.get(a) for a in TEST_ATTRS):
+            score += 1.5
+        if attrs.get("aria-label"):
+            score += 1.0
+        if hint_terms:
+            element_terms = _terms(element.get("text", "") + " " + " ".join(attrs.values()))
+            score += 2.0 * len(hint_terms & element_terms)
+        return score
+
+    def serialize(self, snapshot: dict, hint: str = "", show_ids: bool = False):
+        """Returns (text, report) where report counts the tokens saved by the budget."""
+        elements = snapshot.get("elements", [])
+        hint_terms = _terms(hint or "")
+
+        lines = [self.extractor.render_element(e, show_ids) for e in elements]
+        costs = [self.count_tokens(line) + 1 for line in lines]
+
+        body_text = snapshot.get("body_text", "")
+        body_budget = int(self.token_budget * self.body_share)
+        body_tokens = self.count_tokens(body_text)
+        if body_tokens > body_budget:
+            # Proportional trim, cheaper than re-encoding repeatedly
+            body_text = body_text[:max(0, len(body_text) * body_budget // body_tokens)]
+            body_tokens = self.count_tokens(body_text)
+
+        header = "Page Context:\n\n\nInteractive Elements:\n"
+        footer = "\n(00000 lower-ranked elements omitted to fit the token budget.)"
+        remaining = self.token_budget - body_tokens - self.count_tokens(header) - self.count_tokens(footer)
+
+        ranked = sorted(range(len(elements)), key=lambda i: (-self.score(elements[i], hint_terms), i))
+        selected = []
+        for i in ranked:
+            if costs[i] <= remaining:
+                selected.append(i)
+                remaining -= costs[i]
+        selected.sort() # Back to document order
+
+        omitted = len(elements) - len(selected)
+        text = f"Page Context:\n{body_text}\n\nInteractive Elements:\n" + "\n".join(lines[i] for i in selected)
+        if omitted:
+            text += f"\n({omitted} lower-ranked elements omitted to fit the token budget.)"
+
+        full_tokens = self.count_tokens(snapshot.get("body_text", "")) + self.count_tokens(header) + sum(costs)
+        emitted_tokens = self.count_tokens(text)
+        report = {
+            "elements_total": len(elements),
+            "elements_emitted": len(selected),
+            "tokens_full": full_tokens,
+            "tokens_emitted": emitted_tokens,
+            "tokens_saved": max(0, full_tokens - emitted_tokens),
+        }
+        return text, report
@@ -0,0 +1,182 @@
+import asyncio
+from typing import List, Dict, Any
+from urllib.parse import urlsplit, urlencode, urlunsplit, parse_qsl
+import httpx
+
+# Reads every form (and named inputs outside forms) once from the live DOM
+FORMS_JS = r"""
+() => {
+    const SKIP = new Set(['submit', 'button', 'image', 'reset', 'file']);
+    const fieldsOf = (elements) => Array.from(elements)
+        .filter((el) => el.name && ['INPUT', 'TEXTAREA', 'SELECT'].includes(el.tagName))
+        .map((el) => ({
+            name: el.name,
+            type: (el.getAttribute('type') || el.tagName).toLowerCase(),
+            value: el.value || '',
+        }))
+        .filter((f) => !SKIP.has(f.type));
+
+    const forms = Array.from(document.forms).map((form, index) => ({
+        index: index,
+        action: form.action || location.href,
+        method: (form.getAttribute('method') || 'GET').toUpperCase(),
+        enctype: form.enctype,
+        fields: fieldsOf(form.elements),
+        implicit: false,
+    }));
+
+    // Inputs without a form are usually submitted by script; probe them as GET parameters
+    const orphans = fieldsOf(document.querySelectorAll('input:not(form input), textarea:not(form textarea)'));
+    if (orphans.length) {
+        forms.push({ index: -1, action: location.href, method: 'GET', enctype: '', fields: orphans, implicit: true });
+    }
+    return forms.filter((f) => f.fields.length);
+}
+"""
+
+# Submits a form in the page with the given values (used to confirm POST hits in the DOM)
+SUBMIT_FORM_JS = r"""
+([index, values]) => {
+    const form = document.forms[index];
+    for (const [name, value] of Object.entries(values)) {
+        const field = form.elements.namedItem(name);
+        if (field) field.value = value;
+    }
+    form.requestSubmit ? form.requestSubmit() : form.submit();
+}
+"""
+
+FUZZABLE_TYPES = {'text', 'search', 'email', 'url', 'tel', 'password', 'textarea', 'hidden', 'number'}
+
+
+class HttpFuzzer:
+    """Fires payload variants at form endpoints over HTTP, bypassing the browser.
+
+    Forms are read from the DOM once; requests go through one pooled async client
+    carrying the browser's cookies and encoded as each form's enctype says. The
+    browser is only used afterwards to confirm that reflected XSS candidates
+    actually land unescaped in the rendered DOM.
+
+    TLS certificates are verified like the browser contexts do; pass
+    verify_tls=False only for targets whose browser context also ignores HTTPS
+    errors, since the session cookies travel over this client.
+    """
+
+    def __init__(self, corpus, categories: List[str] = None, concurrency: int = 10, timeout: float = 10.0,
+                 verify_tls: bool = True):
+        self.corpus = corpus # PayloadCorpus
+        self.categories = categories
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.verify_tls = verify_tls
+
+    @staticmethod
+    def build_cookies(cookies: List[Dict[str, Any]]) -> httpx.Cookies:
+        jar = httpx.Cookies()
+        for cookie in cookies:
+            jar.set(cookie["name"], cookie["value"], domain=cookie.get("domain", "").lstrip("."), path=cookie.get("path", "/"))
+        return jar
+
+    @staticmethod
+    def body_arguments(form: Dict[str, Any], values: Dict[str, str]) -> Dict[str, Any]:
+        """httpx request arguments that encode `values` as the form's enctype (urlencoded by default)."""
+        enctype = (form.get("enctype") or "").lower()
+        if enctype == "multipart/form-data":
+            return {"files": {name: (None, value) for name, value in values.items()}} # Fields, not file parts
+        if enctype == "text/plain":
+            return {"content": "\r\n".join(f"{name}={value}" for name, value in values.items()),
+                    "headers": {"Content-Type": "text/plain"}}
+        return {"data": values}
+
+    @staticmethod
+    def build_request(form: Dict[str, Any], field: str, payload: str):
+        """Returns (method, url, data) for one payload variant."""
+        values = {f["name"]: (f["value"] or "test") for f in form["fields"]}
+        values[field] = payload
+        if form["method"] == "GET":
+            parts = urlsplit(form["action"])
+            query = dict(parse_qsl(parts.query))
+            query.update(values)
+            return "GET", urlunsplit(parts._replace(query=urlencode(query), fragment="")), None
+        return form["method"], form["action"], values
+
+    async def _send(self, client, semaphore, form, method, url, data):
+        """Returns (body, final_url), or None if the request failed."""
+        async with semaphore:
+            try:
+                body = self.body_arguments(form, data) if data is not None else {}
+                response = await client.request(method, url, **body)
+                return response.text, str(response.url)
+            except httpx.HTTPError:
+                return None
+
+    async def _confirm_in_dom(self, browser_manager, form, method, url, data, is_reflected) -> bool:
+        """Replays one candidate in the browser and checks the rendered DOM with `is_reflected`."""
+        worker = None
+        try:
+            worker = await browser_manager.clone()
+            if method == "GET":
+                await worker.page.goto(url, timeout=30000)
+            else:
+                await worker.page.evaluate(SUBMIT_FORM_JS, [form["index"], data])
+            await worker.wait_for_settle(label="http-confirm")
+            return is_reflected(await worker.get_content())
+        except Exception as e:
+            browser_manager.logs.append(f"[ERROR] DOM confirmation failed for {url}: {str(e)}")
+            return False
+        finally:
+            if worker:
+                await worker.close()
+
+    async def fuzz(self, browser_manager) -> List[Dict[str, Any]]:
+        """Fuzzes every form on the current page and returns findings in a stable order."""
+        if not browser_manager.page:
+            return []
+        forms = await browser_manager.page.evaluate(FORMS_JS)
+        cookies = self.build_cookies(await browser_manager.get_cookies())
+
+        probes = self.corpus.probes(self.categories)
+        matcher = self.corpus.matcher(probes)
+        baseline = self.corpus.baseline(await browser_manager.get_content())
+
+        jobs = []
+        for form in forms:
+            for field in form["fields"]:
+                if field["type"] not in FUZZABLE_TYPES:
+                    continue
+                for probe in probes:
+                    method, url, data = self.build_request(form, field["name"], probe["value"])
+                    jobs.append((form, field["name"], probe, method, url, data))
+        if not jobs:
+            return []
+        print(f"HTTP fuzzing {len(forms)} forms with {len(jobs)} requests...")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(cookies=cookies, limits=limits, timeout=self.timeout,
+                                     follow_redirects=True, verify=self.verify_tls) as client:
+            responses = await asyncio.gather(*[self._send(client, semaphore, j[0], j[3], j[4], j[5]) for j in jobs])
+
+        findings = []
+        reported = set()
+        for (form, field, probe, method, url, data), response in zip(jobs, responses):
+            if response is None:
+                continue
+            body, final_url = response
+            target = f"Parameter {method} {form['action']} [{field}]"
+            # One finding per (parameter, category); jobs are in corpus order so this is stable
+            for hit in matcher.match(probe, body, final_url, baseline):
+                if (target, hit["category"]) in reported:
+                    continue
+                reported.add((target, hit["category"]))
+                finding = self.corpus.finding(hit, target)
+                if hit["category"] == "xss":
+                    def is_reflected(text, probe=probe):
+                        return any(h["category"] == "xss" for h in matcher.match(probe, text))
+                    if await self._confirm_in_dom(browser_manager, form, method, url, data, is_reflected):
+                        finding["type"] = "Reflected XSS (Confirmed in DOM)"
+                    else:
+                        finding["severity"] = "Medium"
+                        finding["type"] = "Reflected Input (HTTP Response)"
+                findings.append(finding)
+        return findings
@@ -1,32 +1,78 @@
 import os
+import re
 from langchain_core.tools import Tool
+from quantum_qe_core.skills.knowledge_index import KnowledgeIndex
+from quantum_qe_core.skills.knowledge_vectors import VectorIndex
+from quantum_qe_core.tracing import span
+
+# A finding only gets a reference when both indexes rank the same section first with at least these raw scores;
+# reciprocal rank fusion alone always returns something, even for unrelated text
+ENRICH_MIN_BM25 = 1.0
+ENRICH_MIN_COSINE = 0.1
 
 class KnowledgeManager:
-    def __init__(self, knowledge_path: str):
+    def __init__(self, knowledge_path: str, index_cache: str = "output/cache/knowledge_index.json"):
         self.knowledge_path = knowledge_path
+        # BM25 index over heading sections; loaded from cache and refreshed by file mtime
+        self.index = KnowledgeIndex(knowledge_path, cache_path=index_cache)
+        # Character n-gram TF-IDF over the same sections, for paraphrased queries
+        self.vectors = VectorIndex(self.index)
+
+    def warm(self):
+        """Builds (or validates the cached) indexes up front instead of on the first query."""
+        self.index.refresh(force=True)
+        self.vectors.search("warm")
+
+    def search(self, query: str, k: int = 3) -> list:
+        """Returns ranked section hits for a query, fusing BM25 and vector rankings."""
+        fused = {}
+        for ranking in (self.index.search(query, k=k * 2), self.vectors.search(query, k=k * 2)):
+            for rank, hit in enumerate(ranking):
+                key = (hit["source"], hit["title"])
+                entry = fused.setdefault(key, dict(hit, score=0.0))
+                entry["score"] += 1.0 / (60 + rank) # Reciprocal rank fusion
+        return sorted(fused.values(), key=lambda h: -h["score"])[:k]
+
+    def enrich(self, findings: list) -> list:
+        """Attaches the matching knowledge section to each finding as "reference", when there is a clear one.
+
+        Deterministic: the query is the finding's type and details with URLs and
+        numbers stripped, and identical queries are searched once. A section is
+        only attached when BM25 and the vector index agree on it and both scores
+        clear ENRICH_MIN_BM25 / ENRICH_MIN_COSINE; otherwise the finding has no
+        reference rather than a misleading one.
+        """
+        cache = {}
+        with span("knowledge/enrich", "scan", findings=len(findings)):
+            for finding in findings:
+                query = re.sub(r"https?://\S+|\d+", " ", f"{finding.get('type', '')} {finding.get('details', '')}")[:300]
+                if query not in cache:
+                    cache[query] = self._reference(query)
+                if cache[query]:
+                    finding["reference"] = cache[query]
+        return findings
+
+    def _reference(self, query: str):
+        lexical, vector = self.index.search(query, k=1), self.vectors.search(query, k=1)
+        if not lexical or not vector:
+            return None
+        hit = lexical[0]
+        if ((hit["source"], hit["title"]) != (vector[0]["source"], vector[0]["title"])
+                or hit["score"] < ENRICH_MIN_BM25 or vector[0]["score"] < ENRICH_MIN_COSINE):
+            return None
+        return {"source": os.path.basename(hit["source"]), "title": hit["title"], "snippet": (hit["snippet"] or "")[:400]}
 
     def get_tools(self):
-        
+
         def search_knowledge_wrapper(query: str):
             """Searches the knowledge base for a query."""
             results = []
-            # Simple grep-like search for now
-            for root, _, files in os.walk(self.knowledge_path):
-                for file in files:
-                    if file.endswith(".md"):
-                        path = os.path.join(root, file)
-                        try:
-                            with open(path, "r", encoding="utf-8") as f:
-                                content = f.read()
-                                if query.lower() in content.lower():
-                                    # meaningful snippet? just return first 500 chars surrounding match?
-                                    idx = content.lower().find(query.lower())
-                                    start = max(0, idx - 100)
-                                    end = min(len(content), idx + 400)
-                                    results.append(f"Match in {file}:\n...{content[start:end]}...\n")
-                        except Exception as e:
-                            continue
-            
+            with span("tool/SearchSecurityStandards", "tool"):
+                hits = self.search(query)
+            for hit in hits:
+                title = f" ({hit['title']})" if hit['title'] else ""
+                results.append(f"Match in {os.path.basename(hit['source'])}{title}:\n...{hit['snippet'] or hit['title']}...\n")
+
             if not results:
                 return f"No knowledge found for query: {query}"
             return "\n".join(results)[:2000] # Limit output size
@@ -0,0 +1,172 @@
+import os
+import re
+import json
+import math
+import time
+import heapq
+from collections import Counter, defaultdict
+from typing import List, Dict, Any
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'in', 'is', 'it',
+    'of', 'on', 'or', 'that', 'the', 'to', 'was', 'what', 'with', 'do', 'i', 'my',
+}
+INDEX_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+
+
+def chunk_markdown(text: str) -> List[Dict[str, Any]]:
+    """Splits markdown into one chunk per heading section, titled by its heading path."""
+    chunks = []
+    path, lines = [], []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body or path:
+            chunks.append({"title": " > ".join(path), "text": body})
+
+    for line in text.splitlines():
+        match = HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            path = path[:level - 1] + [match.group(2).strip()]
+            lines = []
+        else:
+            lines.append(line)
+    flush()
+    return chunks
+
+
+class KnowledgeIndex:
+    """BM25 inverted index over section-level chunks of the markdown knowledge base.
+
+    The index is persisted as JSON and rebuilt per file when a file's mtime changes,
+    so startup only re-reads files that were edited since the last run.
+    """
+
+    def __init__(self, knowledge_path: str, cache_path: str = None, k1: float = 1.5, b: float = 0.75,
+                 check_interval: float = 2.0):
+        self.knowledge_path = knowledge_path
+        self.cache_path = cache_path
+        self.k1 = k1
+        self.b = b
+        self.check_interval = check_interval # Seconds between mtime checks
+        self.files = {} # path -> {"mtime", "chunks": [{"title", "text", "tf", "length"}]}
+        self.chunks = []
+        self.postings = {}
+        self.norms = [] # Per-chunk BM25 length normalisation, precomputed at build time
+        self.avgdl = 0.0
+        self.generation = 0 # Bumped on every rebuild so derived indexes know to refresh
+        self._last_check = None
+        self._load_cache()
+
+    def _scan(self) -> Dict[str, float]:
+        mtimes = {}
+        for root, _, files in os.walk(self.knowledge_path):
+            for file in files:
+                if file.endswith(".md"):
+                    path = os.path.join(root, file)
+                    mtimes[os.path.relpath(path, self.knowledge_path)] = os.stat(path).st_mtime
+        return mtimes
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("knowledge_path") == os.path.abspath(self.knowledge_path):
+                self.files = data["files"]
+        except (OSError, ValueError, KeyError):
+            self.files = {} # Corrupt cache: rebuild from source
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp" # Shard processes may save at the same time
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "knowledge_path": os.path.abspath(self.knowledge_path), "files": self.files}, f)
+        os.replace(tmp, self.cache_path)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-indexes files whose mtime changed. Returns True if the index was rebuilt."""
+        now = time.monotonic()
+        if not force and self._last_check is not None and now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+
+        mtimes = self._scan()
+        changed = [p for p, m in mtimes.items() if self.files.get(p, {}).get("mtime") != m]
+        removed = [p for p in self.files if p not in mtimes]
+        if not changed and not removed and self.chunks:
+            return False
+
+        for path in removed:
+            del self.files[path]
+        for path in changed:
+            try:
+                with open(os.path.join(self.knowledge_path, path), "r", encoding="utf-8") as f:
+                    sections = chunk_markdown(f.read())
+            except (OSError, UnicodeDecodeError):
+                continue
+            for section in sections:
+                tokens = tokenize(section["title"] + " " + section["text"])
+                section["tf"] = dict(Counter(tokens))
+                section["length"] = len(tokens)
+            self.files[path] = {"mtime": mtimes[path], "chunks": sections}
+
+        self._build_postings()
+        if changed or removed:
+            self._save_cache()
+        return True
+
+    def _build_postings(self):
+        self.chunks = []
+        postings = defaultdict(list)
+        for path in sorted(self.files):
+            for section in self.files[path]["chunks"]:
+                chunk_id = len(self.chunks)
+                self.chunks.append({"source": path, "title": section["title"], "text": section["text"], "length": section["length"]})
+                for term, tf in section["tf"].items():
+                    postings[term].append((chunk_id, tf))
+        self.postings = dict(postings)
+        self.avgdl = sum(c["length"] for c in self.chunks) / len(self.chunks) if self.chunks else 0.0
+        self.norms = [self.k1 * (1 - self.b + self.b * c["length"] / (self.avgdl or 1)) for c in self.chunks]
+        self.generation += 1
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Returns the top-k chunks by BM25 score with a snippet around the best match."""
+        self.refresh()
+        terms = set(tokenize(query))
+        if not terms or not self.chunks:
+            return []
+
+        n = len(self.chunks)
+        norms = self.norms
+        scores = defaultdict(float)
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            weight = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5)) * (self.k1 + 1)
+            for chunk_id, tf in postings:
+                scores[chunk_id] += weight * tf / (tf + norms[chunk_id])
+
+        top = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [dict(self.chunks[cid], score=score, snippet=self.snippet(self.chunks[cid]["text"], terms))
+                for cid, score in top]
+
+    @staticmethod
+    def snippet(text: str, terms: set, width: int = 400) -> str:
+        """Window of `width` chars starting shortly before the first query term."""
+        lower = text.lower()
+        positions = [m.start() for m in (re.search(r"\b" + re.escape(t), lower) for t in terms) if m]
+        start = max(0, min(positions) - 100) if positions else 0
+        return text[start:start + width]
@@ -0,0 +1,95 @@
+import re
+import zlib
+from collections import OrderedDict, Counter
+from typing import List, Dict, Any
+import numpy as np
+
+from quantum_qe_core.skills.knowledge_index import KnowledgeIndex
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def char_ngrams(text: str, sizes=(3, 4, 5)) -> Counter:
+    """Character n-grams inside word boundaries, plus the words themselves.
+
+    'scripting' and 'script' share most of their n-grams, which is what lets a
+    query match morphological variants without any embedding model.
+    """
+    grams = Counter()
+    for word in WORD_RE.findall(text.lower()):
+        grams["w:" + word] += 1
+        padded = f" {word} "
+        for n in sizes:
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class VectorIndex:
+    """CPU-only TF-IDF retrieval over the same section chunks as KnowledgeIndex.
+
+    Features are hashed (crc32, stable across processes) into `dims` columns of a
+    dense float32 matrix with L2-normalised rows, so a query is one matrix-vector
+    product. Memory is chunks x dims x 4 bytes (about 16 KB per chunk at 4096 dims).
+    """
+
+    def __init__(self, knowledge_index: KnowledgeIndex, dims: int = 4096, cache_size: int = 256):
+        self.index = knowledge_index
+        self.dims = dims
+        self.cache_size = cache_size
+        self.matrix = np.zeros((0, dims), dtype=np.float32)
+        self.idf = np.ones(dims, dtype=np.float32)
+        self._generation = None
+        self._cache = OrderedDict()
+
+    def _hash(self, gram: str) -> int:
+        return zlib.crc32(gram.encode("utf-8")) % self.dims
+
+    def _counts(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for gram, count in char_ngrams(text).items():
+            vector[self._hash(gram)] += count
+        return vector
+
+    def _ensure_built(self):
+        self.index.refresh()
+        if self._generation == self.index.generation:
+            return
+        chunks = self.index.chunks
+        counts = np.zeros((len(chunks), self.dims), dtype=np.float32)
+        for i, chunk in enumerate(chunks):
+            counts[i] = self._counts(chunk["title"] + " " + chunk["text"])
+        df = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(chunks)) / (1 + df)) + 1).astype(np.float32)
+        matrix = np.log1p(counts) * self.idf # Sublinear tf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.maximum(norms, 1e-9)
+        self._generation = self.index.generation
+        self._cache.clear()
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Returns the top-k chunks by cosine similarity to the query."""
+        self._ensure_built()
+        key = (query.strip().lower(), k)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        results = []
+        if len(self.matrix):
+            vector = np.log1p(self._counts(query)) * self.idf
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                scores = self.matrix @ (vector / norm)
+                top = np.argsort(-scores, kind="stable")[:k]
+                terms = set(WORD_RE.findall(query.lower()))
+                for cid in top:
+                    if scores[cid] <= 0:
+                        break
+                    chunk = self.index.chunks[cid]
+                    results.append(dict(chunk, score=float(scores[cid]), snippet=self.index.snippet(chunk["text"], terms)))
+
+        self._cache[key] = results
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return results
@@ -0,0 +1,248 @@
+import re
+import asyncio
+from collections import defaultdict
+from typing import List, Dict, Any, Iterable
+from urllib.parse import urlsplit, parse_qsl
+from quantum_qe_core.skills.sensitive_data import SensitiveDataScanner
+
+# (header, description, applies to: "document" responses only or "all", https only)
+HEADER_RULES = [
+    ("Content-Security-Policy", "Mitigates XSS and data injection attacks.", "document", False),
+    ("Strict-Transport-Security", "Enforces HTTPS connections (HSTS).", "all", True),
+    ("X-Frame-Options", "Prevents Clickjacking attacks.", "document", False),
+    ("X-Content-Type-Options", "Prevents MIME sniffing (nosniff).", "all", False),
+    ("Referrer-Policy", "Controls how much referrer information is included with requests.", "document", False),
+]
+RULE_HEADERS = frozenset(header.lower() for header, _, _, _ in HEADER_RULES)
+URL_SAMPLES = 5
+SENSITIVE_PARAM_RE = re.compile(r"^(password|passwd|pwd|pass|token|access_token|auth|api[_-]?key|secret|session(id)?|sid|ssn)$", re.I)
+DISCLOSURE_HEADERS = ["server", "x-powered-by", "x-aspnet-version", "x-aspnetmvc-version"]
+VERSION_RE = re.compile(r"\d+\.\d+")
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def document_kind(record: Dict[str, Any]) -> str:
+    """'document' for pages and frames, 'subresource' for scripts, images, XHR, etc."""
+    resource_type = record.get("resource_type")
+    if resource_type:
+        return "document" if resource_type == "document" else "subresource"
+    headers_lower = {k.lower(): v for k, v in record.get("headers", {}).items()}
+    return "document" if "html" in headers_lower.get("content-type", "").lower() else "subresource"
+
+
+class PassiveAnalyzer:
+    """Incremental header analysis over captured responses.
+
+    Responses are grouped by origin and by fingerprint: (origin, document kind,
+    scheme, which rule headers are present). Rules run once per fingerprint and the
+    result is reused for every response sharing it, so 200 sub-resources served by
+    the same CDN config cost one evaluation. Findings are aggregated per
+    (origin, header, kind) with a count of affected URLs.
+
+    Rules that need only a single response (Set-Cookie flags, sensitive query
+    parameters, version banners, secrets/PII in a response "body" when the
+    record carries one) run in `add()` and are deduplicated per origin.
+    """
+
+    def __init__(self, rules=HEADER_RULES, sensitive: SensitiveDataScanner = None):
+        self.rules = rules
+        self.sensitive = sensitive or SensitiveDataScanner()
+        self.cursor = 0 # seq of the next response not yet ingested
+        self._pending = defaultdict(lambda: defaultdict(list)) # origin -> fingerprint -> urls not evaluated yet
+        self._verdicts = {} # fingerprint -> [(header, description)] missing
+        self._findings = {} # (origin, header, kind) -> finding
+        self._affected = defaultdict(set) # (origin, header, kind) -> urls counted so far
+        self.origins = set()
+        self.stats = {"responses": 0, "fingerprints": 0}
+
+    def add(self, record: Dict[str, Any]):
+        """Indexes one captured response ({url, status, headers[, resource_type]})."""
+        url = record["url"]
+        if not url.startswith(("http://", "https://")):
+            return # data:, blob:, chrome-extension: ...
+        # Playwright lowercases header names; direct callers (scan_headers) may not
+        headers = {k.lower(): v for k, v in record.get("headers", {}).items()}
+        present = RULE_HEADERS.intersection(headers)
+        origin = origin_of(url)
+        fingerprint = (origin, document_kind(record), url.startswith("https://"), frozenset(present))
+        self._pending[origin][fingerprint].append(url)
+        self.origins.add(origin)
+        self.stats["responses"] += 1
+        self._check_cookies(origin, headers.get("set-cookie"))
+        self._check_sensitive(origin, url, headers)
+        if record.get("body"):
+            content_type = headers.get("content-type", "")
+            for hit in self.sensitive.scan_bytes(record["body"], content_type):
+                finding = self.sensitive.finding(hit, url)
+                self._findings.setdefault((origin, "secret", finding["fingerprint"]), finding)
+
+    def _report(self, key: tuple, severity: str, type_: str, details: str, remediation: str):
+        if key not in self._findings:
+            self._findings[key] = {"severity": severity, "type": type_, "details": details, "remediation": remediation}
+
+    def _check_cookies(self, origin: str, set_cookie: str):
+        """Same checks as SecurityAuditor.scan_cookies, on Set-Cookie headers as they arrive."""
+        if not set_cookie:
+            return
+        for line in set_cookie.split("\n"): # Playwright joins repeated headers with newlines
+            name = line.split("=", 1)[0].strip()
+            if not name:
+                continue
+            attributes = {a.split("=", 1)[0].strip().lower(): a.split("=", 1)[-1].strip() for a in line.split(";")[1:]}
+            if "secure" not in attributes:
+                self._report((origin, "cookie", name, "secure"), "Low", "Insecure Cookie",
+                             f"Cookie '{name}' is missing the 'Secure' flag.",
+                             "Set the 'Secure' flag to ensure the cookie is only sent over HTTPS.")
+            if "httponly" not in attributes:
+                self._report((origin, "cookie", name, "httponly"), "Medium", "Insecure Cookie",
+                             f"Cookie '{name}' is missing the 'HttpOnly' flag.",
+                             "Set the 'HttpOnly' flag to prevent access via JavaScript (XSS protection).")
+            same_site = attributes.get("samesite", "None").capitalize()
+            if same_site == "None":
+                self._report((origin, "cookie", name, "samesite"), "Low", "Insecure Cookie",
+                             f"Cookie '{name}' has weak 'SameSite' policy ({same_site}).",
+                             "Set 'SameSite' to 'Lax' or 'Strict' to mitigate CSRF.")
+
+    def _check_sensitive(self, origin: str, url: str, headers: Dict[str, str]):
+        for param, _ in parse_qsl(urlsplit(url).query, keep_blank_values=True):
+            if SENSITIVE_PARAM_RE.match(param):
+                self._report((origin, "url-param", param), "Medium", "Sensitive Data in URL",
+                             f"Parameter '{param}' is sent in the URL query on {origin} (e.g. {url})",
+                             "Send credentials and tokens in headers or POST bodies; URLs end up in logs and Referer headers.")
+        for header in DISCLOSURE_HEADERS:
+            value = headers.get(header)
+            if value and VERSION_RE.search(value):
+                self._report((origin, "disclosure", header, value), "Low", "Information Disclosure",
+                             f"{header.title()} header discloses '{value}' on {origin}",
+                             f"Remove or genericize the {header.title()} header.")
+
+    def ingest(self, responses) -> int:
+        """Indexes responses appended to a ResponseLog since the last call. Returns how many."""
+        fresh = responses.since(self.cursor)
+        for record in fresh:
+            self.add(record)
+        self.cursor = responses.appended
+        return len(fresh)
+
+    def _verdict(self, fingerprint) -> List[tuple]:
+        if fingerprint not in self._verdicts:
+            _, kind, https, present = fingerprint
+            self.stats["fingerprints"] += 1
+            self._verdicts[fingerprint] = [
+                (header, description) for header, description, applies, https_only in self.rules
+                if (applies == "all" or applies == kind) and (https or not https_only) and header.lower() not in present
+            ]
+        return self._verdicts[fingerprint]
+
+    def evaluate(self, origins: Iterable[str] = None) -> List[Dict[str, Any]]:
+        """Applies the rules to pending responses of `origins` (default: all).
+
+        Returns findings that did not exist before; existing findings are updated
+        in place with the new affected-URL counts.
+        """
+        new = []
+        for origin in list(origins if origins is not None else self._pending):
+            for fingerprint, urls in self._pending.pop(origin, {}).items():
+                kind = fingerprint[1]
+                for header, description in self._verdict(fingerprint):
+                    key = (origin, header, kind)
+                    finding = self._findings.get(key)
+                    if finding is None:
+                        finding = self._findings[key] = {
+                            "severity": "Medium",
+                            "type": "Missing Header",
+                            "details": "",
+                            "remediation": f"Implement {header}. {description}",
+                            "affected_urls": 0,
+                            "urls": [],
+                            "fingerprint": f"{origin} {header} {kind}", # Stable while details track counts
+                        }
+                        new.append(finding)
+                    affected = self._affected[key]
+                    for url in urls:
+                        if url not in affected:
+                            affected.add(url)
+                            if len(finding["urls"]) < URL_SAMPLES:
+                                finding["urls"].append(url)
+                    count = finding["affected_urls"] = len(affected)
+                    finding["details"] = (f"Missing {header} on {count} {kind} response{'s' if count != 1 else ''} "
+                                          f"from {origin} (e.g. {finding['urls'][0]})")
+        return new
+
+    def findings(self, origins: Iterable[str] = None) -> List[Dict[str, Any]]:
+        origins = None if origins is None else set(origins)
+        return [f for key, f in self._findings.items() if origins is None or key[0] in origins]
+
+
+class PassivePipeline:
+    """Runs a PassiveAnalyzer in a background task fed by the response hook.
+
+    `submit()` never blocks: records go into an asyncio.Queue bounded both by
+    count (`maxsize`) and by the bytes of the response bodies it holds
+    (`max_bytes`). A record whose body would exceed the byte budget is queued
+    without its body (headers are still analyzed; counted in `bodies_dropped`),
+    and a record that finds the queue full is dropped (counted in `dropped`), so
+    the browser is never slowed down by analysis and a slow analyzer cannot pile
+    up bodies in memory. `drain()` waits for the backlog so findings are current.
+    """
+
+    def __init__(self, analyzer: PassiveAnalyzer = None, maxsize: int = 1000, max_bytes: int = 32 * 1024 * 1024):
+        self.analyzer = analyzer or PassiveAnalyzer()
+        self.queue = asyncio.Queue(maxsize)
+        self.max_bytes = max_bytes
+        self.queued_bytes = 0
+        self.dropped = 0
+        self.bodies_dropped = 0
+        self._task = None
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        body = record.get("body")
+        size = len(body) if body else 0
+        if size and self.queued_bytes + size > self.max_bytes:
+            record, size = dict(record, body=None), 0
+            self.bodies_dropped += 1
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.queued_bytes += size
+        return True
+
+    async def _run(self):
+        while True:
+            record = await self.queue.get()
+            if record.get("body"):
+                self.queued_bytes -= len(record["body"])
+            try:
+                self.analyzer.add(record)
+                if self.queue.empty():
+                    self.analyzer.evaluate() # Evaluate in batches, whenever the backlog is cleared
+            except Exception as e:
+                print(f"[ERROR] Passive analysis failed for {record.get('url')}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def drain(self, timeout: float = 5.0):
+        """Waits (bounded) for queued responses to be analyzed."""
+        if self._task:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.analyzer.evaluate()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,142 @@
+import os
+import re
+import json
+from urllib.parse import urlsplit
+from typing import List, Dict, Any
+
+DEFAULT_PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "payloads")
+# Only payloads meant for the HTML body can share a value: an attribute breakout closes the
+# context for everything after it, and a javascript: URI only works at the start of the value
+BATCHABLE_CONTEXTS = ("html",)
+
+
+class SignatureMatcher:
+    """Matches many literal markers in one pass with a single compiled alternation."""
+
+    def __init__(self, labels: Dict[str, Any], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.labels = {(k.lower() if ignore_case else k): v for k, v in labels.items()}
+        # Longest first so overlapping markers resolve to the most specific one
+        patterns = sorted(labels, key=len, reverse=True)
+        flags = re.IGNORECASE if ignore_case else 0
+        self.regex = re.compile("|".join(re.escape(p) for p in patterns), flags) if patterns else None
+
+    def find_all(self, text: str) -> List[tuple]:
+        """Returns (marker, label) for every distinct marker found, in order of appearance."""
+        if not self.regex or not text:
+            return []
+        seen, hits = set(), []
+        for match in self.regex.finditer(text):
+            key = match.group(0).lower() if self.ignore_case else match.group(0)
+            if key not in seen:
+                seen.add(key)
+                hits.append((key, self.labels[key]))
+        return hits
+
+
+class ProbeMatcher:
+    """Checks one response against every canary marker and error signature of a probe set."""
+
+    def __init__(self, corpus: "PayloadCorpus", probes: List[Dict[str, Any]]):
+        body_markers, url_markers = {}, {}
+        for probe in probes:
+            for instance in probe["instances"]:
+                target = url_markers if corpus.categories[probe["category"]].get("match") == "url" else body_markers
+                for marker in instance["markers"]:
+                    target[marker] = instance
+        self.body = SignatureMatcher(body_markers)
+        self.url = SignatureMatcher(url_markers, ignore_case=True)
+        signatures = {}
+        for name, category in corpus.categories.items():
+            for signature in category.get("signatures", []):
+                signatures.setdefault(signature.lower(), name)
+        self.signatures = SignatureMatcher(signatures, ignore_case=True)
+
+    def match(self, probe: Dict[str, Any], text: str, url: str = "", baseline: set = frozenset()) -> List[Dict[str, Any]]:
+        """Returns hits for `probe` in a response body (and final URL).
+
+        Canary hits are attributed to their payload instance. Error signatures are
+        attributed to the probe's category, ignoring any already present in `baseline`.
+        """
+        hits = []
+        probe_canaries = {i["canary"] for i in probe["instances"]}
+        # URL markers (redirects) only count in the host we ended up on, not echoed in the query
+        host = (urlsplit(url).hostname or "") if url else ""
+        for marker, instance in self.body.find_all(text) + self.url.find_all(host):
+            if instance["canary"] in probe_canaries:
+                hits.append({"category": instance["category"], "payload": instance["value"], "evidence": marker})
+        for signature, category in self.signatures.find_all(text):
+            if signature not in baseline and category == probe["category"]:
+                hits.append({"category": category, "payload": probe["value"], "evidence": signature})
+        return hits
+
+
+class PayloadCorpus:
+    """Payload sets loaded from quantum_qe_core/payloads/*.json.
+
+    Templates may contain `{canary}`, replaced by a unique token per payload
+    instance so that one response can be checked for every marker at once.
+    """
+
+    def __init__(self, path: str = DEFAULT_PAYLOAD_DIR):
+        self.path = path
+        self.categories = {}
+        for file in sorted(os.listdir(path)):
+            if file.endswith(".json"):
+                with open(os.path.join(path, file), "r", encoding="utf-8") as f:
+                    category = json.load(f)
+                self.categories[category["category"]] = category
+
+    def probes(self, categories: List[str] = None, batch_size: int = 4, max_length: int = 512) -> List[Dict[str, Any]]:
+        """Expands the corpus into submissions.
+
+        Batchable categories pack up to `batch_size` canary-tagged payloads of an
+        html context (the default) into one value; attribute, script and url
+        context payloads, and every payload of other categories, are sent one per
+        submission. Canaries are numbered
+        in corpus order, so the same corpus always yields the same probes.
+        """
+        counter = 0
+        probes = []
+        for name in categories or list(self.categories):
+            category = self.categories[name]
+            batch = []
+            for payload in category["payloads"]:
+                counter += 1
+                canary = f"qe{counter:04d}z"
+                value = payload["template"].replace("{canary}", canary)
+                instance = {
+                    "category": name,
+                    "id": payload["id"],
+                    "canary": canary,
+                    "value": value,
+                    "markers": [m.replace("{canary}", canary) for m in payload.get("markers", [])],
+                }
+                if not category.get("batchable") or payload.get("context", "html") not in BATCHABLE_CONTEXTS:
+                    probes.append({"category": name, "value": value, "instances": [instance]})
+                    continue
+                if batch and (len(batch) >= batch_size or len(" ".join(i["value"] for i in batch + [instance])) > max_length):
+                    probes.append({"category": name, "value": " ".join(i["value"] for i in batch), "instances": batch})
+                    batch = []
+                batch.append(instance)
+            if batch:
+                probes.append({"category": name, "value": " ".join(i["value"] for i in batch), "instances": batch})
+        return probes
+
+    def matcher(self, probes: List[Dict[str, Any]]) -> ProbeMatcher:
+        return ProbeMatcher(self, probes)
+
+    def baseline(self, text: str) -> set:
+        """Error signatures already present before fuzzing (ignored as evidence)."""
+        return {signature for signature, _ in self.matcher([]).signatures.find_all(text)}
+
+    def finding(self, hit: Dict[str, Any], target: str) -> Dict[str, Any]:
+        """Builds a finding dict for a hit on `target` (e.g. 'Input at #search')."""
+        category = self.categories[hit["category"]]
+        detail = category["detail"].replace("{payload}", hit["payload"]).replace("{evidence}", hit["evidence"])
+        return {
+            "severity": category["severity"],
+            "type": category["type"],
+            "details": f"{target} {detail}",
+            "remediation": category["remediation"]
+        }
@@ -3,116 +3,216 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as Pl
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 import os
+import json
 from datetime import datetime
+from quantum_qe_core.tracing import span
+
+
+class _FlowableStream(list):
+    """List that refills itself from a generator as platypus consumes it.
+
+    SimpleDocTemplate.build() only needs len(), [0] and pop(0) on its flowables, so
+    handing it this keeps roughly one chunk of flowables alive instead of the whole story.
+    """
+
+    def __init__(self, source, chunk: int = 64):
+        super().__init__()
+        self._source = source
+        self._chunk = chunk
+
+    def __len__(self):
+        while list.__len__(self) < self._chunk:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                break
+        return list.__len__(self)
+
 
 class TestReporter:
-    def __init__(self, filename="test_report.pdf"):
+    """Collects steps in an append-only JSONL journal and renders the PDF from it.
+
+    Every step is flushed and fsynced as it happens, so a crash loses nothing: the
+    report can be rebuilt later with `TestReporter.from_journal(...)`. Rendering
+    streams the journal into the PDF in small chunks, so memory does not grow with
+    the number of steps.
+    """
+
+    def __init__(self, filename="test_report.pdf", journal_path: str = None, resume: bool = False):
         self.filename = filename
-        self.steps = []
-        self.security_findings = []
+        self.journal_path = journal_path or os.path.splitext(filename)[0] + ".journal.jsonl"
         self.start_time = datetime.now()
+        self.step_count = 0
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        if resume and os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                self.step_count = sum(1 for record in self._records(f) if record["kind"] == "step")
+        else:
+            open(self.journal_path, "w", encoding="utf-8").close()
+
+    @classmethod
+    def from_journal(cls, journal_path: str, filename: str = None) -> "TestReporter":
+        """Reopens an existing journal (e.g. after a crash) to render or extend it."""
+        return cls(filename or journal_path.replace(".journal.jsonl", "") + ".pdf", journal_path, resume=True)
+
+    @staticmethod
+    def _records(lines):
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue # Torn last line from a crash mid-write
+
+    def _append(self, record: dict):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
 
     def add_step(self, description: str, status: str = "INFO", screenshot_path: str = None):
         """Logs a step in the report."""
-        self.steps.append({
-            "timestamp": datetime.now(),
+        self.step_count += 1
+        self._append({
+            "kind": "step",
+            "timestamp": datetime.now().isoformat(),
             "description": description,
             "status": status,
-            "screenshot": screenshot_path,
-            "security_findings": [] 
+            "screenshot": screenshot_path
         })
 
     def log_security_finding(self, findings: list):
         """Logs security findings (list of dicts)."""
         if findings:
             # Associate with the last step if possible, otherwise global list
-            if self.steps:
-                self.steps[-1]["security_findings"].extend(findings)
-            else:
-                self.security_findings.extend(findings)
+            self._append({"kind": "findings", "attach": "step" if self.step_count else "global", "findings": findings})
 
-    def generate_report(self, filename=None):
-        target_file = filename or self.filename
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(target_file) or ".", exist_ok=True)
-        
-        doc = SimpleDocTemplate(target_file, pagesize=letter)
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Styles
+    def extend_from_journal(self, journal_path: str, prefix: str = "") -> int:
+        """Appends another report's steps and findings (e.g. one scenario of a batch). Returns steps copied."""
+        copied = 0
+        with open(journal_path, "r", encoding="utf-8") as source, open(self.journal_path, "a", encoding="utf-8") as out:
+            for record in self._records(source):
+                if record["kind"] == "step":
+                    record["description"] = prefix + record["description"]
+                    copied += 1
+                elif self.step_count + copied:
+                    record["attach"] = "step" # Findings logged before the part's first step go to our last step
+                out.write(json.dumps(record) + "\n")
+            out.flush()
+            os.fsync(out.fileno()) # One sync for the whole copy
+        self.step_count += copied
+        return copied
+
+    def _step_flowables(self, index: int, step: dict, styles):
+        normal_style = styles['Normal']
+
+        # Step Description
+        status_color = "black"
+        if step['status'] == 'PASS': status_color = "green"
+        elif step['status'] == 'FAIL': status_color = "red"
+
+        timestamp = datetime.fromisoformat(step['timestamp'])
+        step_text = f"<b>Step {index}:</b> {step['description']} (<font color='{status_color}'>{step['status']}</font>)"
+        yield Paragraph(step_text, normal_style)
+        yield Paragraph(f"<i>Timestamp: {timestamp.strftime('%H:%M:%S')}</i>", normal_style)
+        yield Spacer(1, 6)
+
+        # Screenshot
+        if step['screenshot']:
+            try:
+                # Resizing image to fit width (approx 6 inches)
+                img = PlatypusImage(step['screenshot'], width=4*inch, height=3*inch, kind='proportional')
+                yield img
+                yield Spacer(1, 6)
+            except Exception as e:
+                yield Paragraph(f"<i>(Screenshot missing or invalid: {e})</i>", normal_style)
+
+        # Security Findings for this step
+        if step.get("security_findings"):
+            yield Paragraph("<b>Security Insights (Passive Scan):</b>", normal_style)
+
+            for finding in step["security_findings"]:
+                severity = finding.get('severity', 'Info')
+                sev_color = "black"
+                if severity == 'Critical': sev_color = "red"
+                elif severity == 'High': sev_color = "orange"
+
+                title = finding.get('type', 'Finding')
+                details = finding.get('details', '')
+                remediation = finding.get('remediation', '')
+
+                finding_text = f"[{severity}] {title}: {details}"
+                yield Paragraph(f"<font color='{sev_color}'>{finding_text}</font>", normal_style)
+                if remediation:
+                     yield Paragraph(f"<i>Remediation: {remediation}</i>", normal_style)
+                reference = finding.get('reference')
+                if reference:
+                    title_part = f" - {reference['title']}" if reference.get('title') else ""
+                    yield Paragraph(f"<i>Reference: {reference['source']}{title_part}</i>", normal_style)
+                yield Spacer(1, 4)
+
+        yield Spacer(1, 12)
+
+    def _story(self, styles):
+        """Yields the report's flowables while reading the journal sequentially."""
         title_style = styles['Title']
         heading_style = styles['Heading2']
         normal_style = styles['Normal']
-        code_style = styles['Code']
 
         # Title
-        story.append(Paragraph("Quantum QE Agent Report", title_style))
-        story.append(Spacer(1, 12))
-        
+        yield Paragraph("Quantum QE Agent Report", title_style)
+        yield Spacer(1, 12)
+
         # Timestamp
-        story.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", normal_style))
-        story.append(Spacer(1, 12))
+        yield Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", normal_style)
+        yield Spacer(1, 12)
 
         # --- Section 1: Functional Test Log ---
-        story.append(Paragraph("1. Functional Test Log", heading_style))
-        story.append(Spacer(1, 6))
-
-        for i, step in enumerate(self.steps):
-            # Step Description
-            status_color = "black"
-            if step['status'] == 'PASS': status_color = "green"
-            elif step['status'] == 'FAIL': status_color = "red"
-            
-            step_text = f"<b>Step {i+1}:</b> {step['description']} (<font color='{status_color}'>{step['status']}</font>)"
-            story.append(Paragraph(step_text, normal_style))
-            story.append(Paragraph(f"<i>Timestamp: {step['timestamp'].strftime('%H:%M:%S')}</i>", normal_style))
-            story.append(Spacer(1, 6))
-
-            # Screenshot
-            if step['screenshot']:
-                try:
-                    # Resizing image to fit width (approx 6 inches)
-                    img = PlatypusImage(step['screenshot'], width=4*inch, height=3*inch, kind='proportional')
-                    story.append(img)
-                    story.append(Spacer(1, 6))
-                except Exception as e:
-                    story.append(Paragraph(f"<i>(Screenshot missing or invalid: {e})</i>", normal_style))
-            
-            # Security Findings for this step
-            if step.get("security_findings"):
-                story.append(Paragraph("<b>Security Insights (Passive Scan):</b>", normal_style))
-                
-                for finding in step["security_findings"]:
-                    severity = finding.get('severity', 'Info')
-                    sev_color = "black"
-                    if severity == 'Critical': sev_color = "red"
-                    elif severity == 'High': sev_color = "orange"
-                    
-                    title = finding.get('type', 'Finding')
-                    details = finding.get('details', '')
-                    remediation = finding.get('remediation', '')
-                    
-                    finding_text = f"[{severity}] {title}: {details}"
-                    story.append(Paragraph(f"<font color='{sev_color}'>{finding_text}</font>", normal_style))
-                    if remediation:
-                         story.append(Paragraph(f"<i>Remediation: {remediation}</i>", normal_style))
-                    story.append(Spacer(1, 4))
-
-            story.append(Spacer(1, 12))
-            
+        yield Paragraph("1. Functional Test Log", heading_style)
+        yield Spacer(1, 6)
+
+        # A step is rendered once the next step (or EOF) shows no more findings attach to it
+        has_global = False
+        current, index = None, 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for record in self._records(f):
+                if record["kind"] == "step":
+                    if current:
+                        yield from self._step_flowables(index, current, styles)
+                    index += 1
+                    current = dict(record, security_findings=[])
+                elif record["kind"] == "findings":
+                    if record["attach"] == "step" and current:
+                        current["security_findings"].extend(record["findings"])
+                    else:
+                        has_global = True
+        if current:
+            yield from self._step_flowables(index, current, styles)
+
         # --- Section 2: Global Security Findings (if any unattached) ---
-        if self.security_findings:
-            story.append(Paragraph("2. General Security Findings", heading_style))
-            for finding in self.security_findings:
-                 severity = finding.get('severity', 'Info')
-                 title = finding.get('type', 'Finding')
-                 details = finding.get('details', '')
-                 story.append(Paragraph(f"[{severity}] {title}: {details}", normal_style))
-                 story.append(Spacer(1, 4))
+        if has_global:
+            yield Paragraph("2. General Security Findings", heading_style)
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for record in self._records(f):
+                    if record["kind"] != "findings" or record["attach"] == "step":
+                        continue
+                    for finding in record["findings"]:
+                        severity = finding.get('severity', 'Info')
+                        title = finding.get('type', 'Finding')
+                        details = finding.get('details', '')
+                        yield Paragraph(f"[{severity}] {title}: {details}", normal_style)
+                        yield Spacer(1, 4)
+
+    def generate_report(self, filename=None):
+        target_file = filename or self.filename
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(target_file) or ".", exist_ok=True)
+
+        doc = SimpleDocTemplate(target_file, pagesize=letter)
+        styles = getSampleStyleSheet()
 
         try:
-            doc.build(story)
+            with span("report/build", "report", steps=self.step_count):
+                doc.build(_FlowableStream(self._story(styles)))
             print(f"Report generated: {target_file}")
         except Exception as e:
             print(f"Failed to generate report: {e}")
@@ -1,32 +1,36 @@
 import asyncio
 from typing import List, Dict, Any
 from langchain_core.tools import Tool
+from quantum_qe_core.skills.http_fuzzer import HttpFuzzer
+from quantum_qe_core.skills.payloads import PayloadCorpus
+from quantum_qe_core.skills.passive import PassiveAnalyzer, origin_of
+from quantum_qe_core.tracing import span, traced
+
+# Every submission through the browser costs a settle wait; keep that path to the core checks
+BROWSER_CATEGORIES = ["xss", "ssti", "sqli"]
 
 class SecurityAuditor:
-    def __init__(self):
+    def __init__(self, corpus: PayloadCorpus = None):
         self.findings = []
+        self.corpus = corpus or PayloadCorpus()
+        self.passive = PassiveAnalyzer()
+        self.sensitive = self.passive.sensitive
 
     def scan_headers(self, url: str, headers: Dict[str, str]):
         """Analyzes HTTP response headers for missing security mechanisms."""
-        required_headers = {
-            "Content-Security-Policy": "Mitigates XSS and data injection attacks.",
-            "Strict-Transport-Security": "Enforces HTTPS connections (HSTS).",
-            "X-Frame-Options": "Prevents Clickjacking attacks.",
-            "X-Content-Type-Options": "Prevents MIME sniffing (nosniff).",
-            "Referrer-Policy": "Controls how much referrer information is included with requests."
-        }
-
-        # Normalize headers to lowercase for case-insensitive comparison
-        headers_lower = {k.lower(): v for k, v in headers.items()}
-
-        for header, description in required_headers.items():
-            if header.lower() not in headers_lower:
-                self.findings.append({
-                    "severity": "Medium",
-                    "type": "Missing Header",
-                    "details": f"Missing {header} on {url}",
-                    "remediation": f"Implement {header}. {description}"
-                })
+        # An explicit call is about a page: apply the document rules whatever the content type says
+        self.passive.add({"url": url, "headers": headers, "resource_type": "document"})
+        self._collect_passive(self.passive, [origin_of(url)])
+
+    def scan_passive(self, origins=None):
+        """Collects header findings for responses added to `self.passive` (all origins by default)."""
+        self._collect_passive(self.passive, origins)
+
+    def _collect_passive(self, analyzer: PassiveAnalyzer, origins=None):
+        # Aggregated findings are updated in place; _add_finding skips ones already listed
+        analyzer.evaluate(origins)
+        for finding in analyzer.findings(origins):
+            self._add_finding(finding)
 
     def scan_cookies(self, cookies: List[Dict[str, Any]]):
         """Analyzes cookies for missing security flags."""
@@ -34,7 +38,7 @@ class SecurityAuditor:
             name = cookie.get('name', 'Unknown')
             
             if not cookie.get('secure', False):
-                self.findings.append({
+                self._add_finding({
                     "severity": "Low",
                     "type": "Insecure Cookie",
                     "details": f"Cookie '{name}' is missing the 'Secure' flag.",
@@ -42,7 +46,7 @@ class SecurityAuditor:
                 })
             
             if not cookie.get('httpOnly', False):
-                self.findings.append({
+                self._add_finding({
                     "severity": "Medium",
                     "type": "Insecure Cookie",
                     "details": f"Cookie '{name}' is missing the 'HttpOnly' flag.",
@@ -51,65 +55,144 @@ class SecurityAuditor:
             
             same_site = cookie.get('sameSite', 'None')
             if same_site == 'None' or not same_site:
-                self.findings.append({
+                self._add_finding({
                     "severity": "Low",
                     "type": "Insecure Cookie",
                     "details": f"Cookie '{name}' has weak 'SameSite' policy ({same_site}).",
                     "remediation": "Set 'SameSite' to 'Lax' or 'Strict' to mitigate CSRF."
                 })
 
-    async def active_scan(self, browser_manager):
-        """Performs active scanning (fuzzing) on identified inputs."""
-        inputs = await browser_manager.get_input_elements()
-        if not inputs:
-            return
+    def scan_sensitive_data(self, text: str, source: str) -> int:
+        """Scans text (e.g. page HTML) for secrets and PII. Returns the number of new findings."""
+        added = 0
+        with span("scan/sensitive", "scan", bytes=len(text)):
+            hits = self.sensitive.scan_text(text)
+        for hit in hits:
+            added += self._add_finding(self.sensitive.finding(hit, source))
+        return added
+
+    async def passive_scan(self, browser_manager, url: str) -> bool:
+        """Header and cookie checks for a URL from the captured responses. False if none was captured."""
+        cookies = await browser_manager.get_cookies()
 
-        print(f"Starting Active Scan on {len(inputs)} inputs...")
+        # Scan headers: the background pipeline has usually analyzed everything already
+        pipeline = getattr(browser_manager, "passive", None)
+        if pipeline:
+            await pipeline.drain()
+            analyzer = pipeline.analyzer
+        else:
+            analyzer = self.passive
+            analyzer.ingest(browser_manager.responses)
+        origins = [o for o in analyzer.origins if o == origin_of(url) or url in o]
+        self._collect_passive(analyzer, origins)
 
-        for input_elem in inputs:
-            selector = input_elem['selector']
-            print(f"Fuzzing input: {selector}")
+        # Scan cookies
+        self.scan_cookies(cookies)
+        return bool(origins)
 
-            # 1. Reflected XSS Test
-            xss_payload = "<script>console.log('XSS_TEST')</script>"
-            await browser_manager.type_text(selector, xss_payload)
+    def _add_finding(self, finding: Dict[str, Any]) -> bool:
+        """Adds a finding unless an identical (type, details) one was already reported."""
+        key = (finding["type"], finding["details"])
+        if any((f["type"], f["details"]) == key for f in self.findings):
+            return False
+        self.findings.append(finding)
+        return True
+
+    async def _fuzz_input(self, browser_manager, input_elem, probes, matcher, baseline) -> List[Dict[str, Any]]:
+        """Submits every probe through one input and returns its findings (one per category)."""
+        selector = input_elem['selector']
+        print(f"Fuzzing input: {selector}")
+        start_url = await browser_manager.get_url()
+        findings = []
+        reported = set()
+
+        for probe in probes:
+            if probe["category"] in reported:
+                continue
+            if await browser_manager.get_url() != start_url:
+                # The previous submission navigated away; the input lives on the start page
+                await browser_manager.page.goto(start_url, timeout=30000)
+            await browser_manager.type_text(selector, probe["value"])
             # Try to trigger it (press Enter)
             await browser_manager.press_key(selector, "Enter")
             
             # Allow time for processing
-            await asyncio.sleep(1)
+            await browser_manager.wait_for_settle(label="scan")
             
-            # Check for reflection (Basic)
             # Use get_content to see raw HTML (including scripts that get_simplified_dom might remove)
             page_content = await browser_manager.get_content()
             
-            # If the payload appears unescaped in the HTML, it's a likely vulnerability.
-            if xss_payload in page_content:
-                 self.findings.append({
-                    "severity": "High",
-                    "type": "Reflected Input (Potential XSS)",
-                    "details": f"Input at {selector} reflects injected values without escaping: {xss_payload}",
-                    "remediation": "Ensure all user input is output encoded."
-                })
+            # One pass checks the content for every canary marker and error signature
+            for hit in matcher.match(probe, page_content, await browser_manager.get_url(), baseline):
+                if hit["category"] not in reported:
+                    reported.add(hit["category"])
+                    findings.append(self.corpus.finding(hit, f"Input at {selector}"))
+        return findings
 
-            # 2. SQL Injection Test (Basic)
-            sqli_payload = "' OR '1'='1"
-            await browser_manager.type_text(selector, sqli_payload)
-            await browser_manager.press_key(selector, "Enter")
-            await asyncio.sleep(1)
-            
-            # Re-fetch content for SQLi check
-            page_content_sqli = await browser_manager.get_content()
-            
-            sql_errors = ["syntax error", "mysql", "sql syntax", "unrecognized token"]
-            for err in sql_errors:
-                if err in page_content_sqli.lower():
-                    self.findings.append({
-                        "severity": "Critical",
-                        "type": "SQL Injection Susceptibility",
-                        "details": f"Input at {selector} caused a potential database error: '{err}'",
-                        "remediation": "Use parameterized queries to prevent SQL injection."
-                    })
+    @traced("scan/active", "scan")
+    async def active_scan(self, browser_manager, concurrency: int = 4, categories: List[str] = None):
+        """Performs active scanning (fuzzing) on identified inputs.
+
+        With concurrency > 1 each worker fuzzes inputs on its own clone of the current
+        page, so inputs are probed in parallel and the shared page is left untouched.
+        Findings are merged in input order and deduplicated, independent of timing.
+        """
+        inputs = await browser_manager.get_input_elements()
+        if not inputs:
+            return
+
+        probes = self.corpus.probes(categories or BROWSER_CATEGORIES)
+        matcher = self.corpus.matcher(probes)
+        baseline = self.corpus.baseline(await browser_manager.get_content())
+
+        workers = min(concurrency, len(inputs))
+        print(f"Starting Active Scan on {len(inputs)} inputs ({workers} workers)...")
+
+        results = [None] * len(inputs)
+        if workers > 1:
+            queue = asyncio.Queue()
+            for item in enumerate(inputs):
+                queue.put_nowait(item)
+
+            async def worker():
+                clone = None
+                try:
+                    clone = await browser_manager.clone()
+                    fresh = True
+                    while not queue.empty():
+                        i, input_elem = queue.get_nowait()
+                        if not fresh:
+                            # Reset page state left by the previous input's payloads
+                            await clone.page.goto(browser_manager.page.url, timeout=30000)
+                        fresh = False
+                        try:
+                            results[i] = await self._fuzz_input(clone, input_elem, probes, matcher, baseline)
+                        except Exception as e:
+                            results[i] = []
+                            browser_manager.logs.append(f"[ERROR] Active scan failed on {input_elem['selector']}: {str(e)}")
+                except Exception as e:
+                    browser_manager.logs.append(f"[ERROR] Active scan worker failed: {str(e)}")
+                finally:
+                    if clone:
+                        await clone.close()
+
+            await asyncio.gather(*[worker() for _ in range(workers)])
+
+        # Sequential path, also picks up inputs left over if cloning the page failed
+        for i, input_elem in enumerate(inputs):
+            if results[i] is None:
+                results[i] = await self._fuzz_input(browser_manager, input_elem, probes, matcher, baseline)
+
+        for input_findings in results:
+            for finding in input_findings:
+                self._add_finding(finding)
+
+    @traced("scan/http", "scan")
+    async def http_scan(self, browser_manager, concurrency: int = 10):
+        """Fuzzes the page's forms over HTTP; the browser only confirms XSS hits."""
+        fuzzer = HttpFuzzer(self.corpus, concurrency=concurrency)
+        for finding in await fuzzer.fuzz(browser_manager):
+            self._add_finding(finding)
 
     def get_findings(self) -> List[Dict[str, Any]]:
         return self.findings
@@ -117,28 +200,33 @@ class SecurityAuditor:
     def get_tools(self, browser_manager):
         """Returns tools for security scanning."""
         
+        @traced("tool/SecurityActiveScan", "tool")
         async def active_scan_wrapper(input_str: str = ""):
             """Triggers active scan on current page. Input is ignored."""
             print(f"[DEBUG] Active Scan triggered via Tool")
             await self.active_scan(browser_manager)
             return f"Active Scan Complete. Total findings: {len(self.findings)}"
 
+        @traced("tool/SecurityHttpFuzz", "tool")
+        async def http_scan_wrapper(input_str: str = ""):
+            """Triggers HTTP-level form fuzzing on current page. Input is ignored."""
+            print(f"[DEBUG] HTTP Fuzz triggered via Tool")
+            await self.http_scan(browser_manager)
+            return f"HTTP Fuzz Complete. Total findings: {len(self.findings)}"
+
+        @traced("tool/SecuritySensitiveDataScan", "tool")
+        async def sensitive_scan_wrapper(input_str: str = ""):
+            """Scans the current page's HTML for secrets/PII. Input is ignored."""
+            print(f"[DEBUG] Sensitive Data Scan triggered via Tool")
+            url = await browser_manager.get_url()
+            added = self.scan_sensitive_data(await browser_manager.get_content(), url)
+            return f"Sensitive Data Scan Complete. {added} new findings. Total findings: {len(self.findings)}"
+
+        @traced("tool/SecurityPassiveScan", "tool")
         async def passive_scan_wrapper(url: str):
             """Triggers passive scan for a specific URL."""
             print(f"[DEBUG] Passive Scan triggered for {url}")
-            responses = await browser_manager.get_responses()
-            cookies = await browser_manager.get_cookies()
-            
-            # Scan headers
-            scanned = False
-            for response in responses:
-                # Simple matching
-                if url in response['url']: 
-                    self.scan_headers(response['url'], response['headers'])
-                    scanned = True
-            
-            # Scan cookies
-            self.scan_cookies(cookies)
+            scanned = await self.passive_scan(browser_manager, url)
             
             if not scanned:
                 return f"Passive Scan: No captured response found for {url}. Parsed cookies only."
@@ -149,7 +237,19 @@ class SecurityAuditor:
                 name="SecurityActiveScan",
                 func=active_scan_wrapper,
                 coroutine=active_scan_wrapper,
-                description="Performs active vulnerability scanning (XSS/SQLi) on the current page. Input: 'scan' (or empty)."
+                description="Performs active vulnerability scanning (XSS/SSTI/SQLi) on the current page. Input: 'scan' (or empty)."
+            ),
+            Tool(
+                name="SecurityHttpFuzz",
+                func=http_scan_wrapper,
+                coroutine=http_scan_wrapper,
+                description="Fast fuzzing (XSS, SQLi, SSTI, path traversal, open redirect) of the page's forms via direct HTTP requests (browser only confirms hits). Input: 'scan' (or empty)."
+            ),
+            Tool(
+                name="SecuritySensitiveDataScan",
+                func=sensitive_scan_wrapper,
+                coroutine=sensitive_scan_wrapper,
+                description="Scans the current page's HTML for exposed secrets (API keys, tokens, private keys) and PII (emails, card numbers). Input: 'scan' (or empty)."
             ),
              Tool(
                 name="SecurityPassiveScan",
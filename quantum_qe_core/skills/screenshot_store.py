@@ -0,0 +1,128 @@
+import io
+import os
+import time
+import base64
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Optional
+from PIL import Image
+
+
+def dhash(image: Image.Image, size: int = 16) -> int:
+    """Difference hash of size*size bits; near-identical frames (caret blink, JPEG noise) differ in a few bits."""
+    pixels = list(image.convert("L").resize((size + 1, size), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (size + 1) + col + 1])
+    return bits
+
+
+class Frame:
+    """One screenshot of the page, captured once per observation.
+
+    The same bytes serve the LLM view and the report; the base64 form is only
+    computed if something asks for it (i.e. the agent runs with vision input).
+    """
+
+    def __init__(self, data: bytes, url: str = ""):
+        self.data = data
+        self.url = url
+        self.captured_at = time.time()
+
+    @cached_property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("utf-8")
+
+
+class ScreenshotStore:
+    """Content-addressed store for report screenshots.
+
+    Frames are keyed by the SHA-256 of their bytes, so a frame identical to one
+    already stored (e.g. a click that changed nothing) is not written again and
+    every step showing it references the same file. With `perceptual=True` frames
+    whose dHash is within `threshold` bits of a stored one are also merged.
+    Decoding, hashing and downscaling run in a thread pool, off the event loop.
+    """
+
+    def __init__(self, root: str = "output/report_screenshots", thumb_width: int = 800, quality: int = 70,
+                 perceptual: bool = False, threshold: int = 6, keep_originals: bool = False, max_workers: int = 2):
+        self.root = root
+        self.thumb_width = thumb_width
+        self.quality = quality
+        self.perceptual = perceptual
+        self.threshold = threshold
+        self.keep_originals = keep_originals
+        self.max_workers = max_workers
+        self.stats = {"frames": 0, "unique": 0, "bytes_in": 0, "bytes_written": 0}
+        self._by_digest = {} # sha256 -> Future[path]
+        self._by_dhash = [] # (dhash, path) of stored frames
+        self._lock = threading.Lock()
+        self._executor = None
+
+    async def add(self, data: bytes) -> Optional[str]:
+        """Stores a frame (PNG/JPEG bytes) and returns the path of its shared thumbnail."""
+        if not data:
+            return None
+        self.stats["frames"] += 1
+        self.stats["bytes_in"] += len(data)
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._by_digest:
+            return await self._by_digest[digest]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._by_digest[digest] = future # Concurrent adds of the same frame wait on this one
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="screenshots")
+        try:
+            path = await loop.run_in_executor(self._executor, self._store, digest, data)
+        except Exception as e:
+            del self._by_digest[digest]
+            future.set_exception(e)
+            future.exception() # Mark as retrieved when nobody else is waiting
+            raise
+        future.set_result(path)
+        return path
+
+    def _store(self, digest: str, data: bytes) -> str:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+
+        if self.perceptual:
+            frame_hash = dhash(image)
+            with self._lock:
+                for known, path in self._by_dhash:
+                    if bin(known ^ frame_hash).count("1") <= self.threshold:
+                        return path
+
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f"frame_{digest[:16]}.jpg")
+        if self.keep_originals:
+            ext = "png" if data[:4] == b"\x89PNG" else "jpg"
+            with open(os.path.join(self.root, f"frame_{digest[:16]}_full.{ext}"), "wb") as f:
+                f.write(data)
+
+        thumb = image.convert("RGB")
+        if thumb.width > self.thumb_width:
+            thumb = thumb.resize((self.thumb_width, round(thumb.height * self.thumb_width / thumb.width)), Image.LANCZOS)
+        buffer = io.BytesIO()
+        thumb.save(buffer, format="JPEG", quality=self.quality, optimize=True)
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+
+        with self._lock:
+            self.stats["unique"] += 1
+            self.stats["bytes_written"] += buffer.tell()
+            if self.perceptual:
+                self._by_dhash.append((frame_hash, path))
+        return path
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
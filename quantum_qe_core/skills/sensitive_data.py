@@ -0,0 +1,186 @@
+import re
+import codecs
+import string
+import hashlib
+from typing import List, Dict, Any, Iterable, Iterator
+
+# (rule name, label, severity, pattern, anchors). Anchors are lowercase literals one of which
+# occurs in (or just before) every match; DIGITS marks rules found via the digit-run prefilter.
+DIGITS = "digits"
+SENSITIVE_RULES = [
+    ("private_key", "Private Key", "Critical",
+     r"-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----", ("private key",)),
+    ("aws_access_key", "AWS Access Key ID", "High",
+     r"(?<![A-Z0-9])(?:AKIA|ASIA|AGPA|AIDA|AROA|ANPA|ANVA|AIPA)[A-Z0-9]{16}(?![A-Z0-9])",
+     ("akia", "asia", "agpa", "aida", "aroa", "anpa", "anva", "aipa")),
+    ("aws_secret_key", "AWS Secret Access Key", "Critical",
+     r"(?i:aws.{0,20}?(?:secret|private).{0,20}?['\"][A-Za-z0-9/+=]{40}['\"])", ("aws",)),
+    ("gcp_api_key", "Google API Key", "High", r"AIza[0-9A-Za-z_\-]{35}", ("aiza",)),
+    ("gcp_service_account", "Google Service Account Key", "Critical", r"\"type\"\s*:\s*\"service_account\"",
+     ("service_account",)),
+    ("azure_storage_key", "Azure Storage Account Key", "Critical", r"AccountKey=[A-Za-z0-9+/=]{86,88}", ("accountkey=",)),
+    ("github_token", "GitHub Token", "High", r"(?:gh[pousr]_[A-Za-z0-9]{36,255}|github_pat_[A-Za-z0-9_]{82})",
+     ("ghp_", "gho_", "ghu_", "ghs_", "ghr_", "github_pat_")),
+    ("gitlab_token", "GitLab Token", "High", r"glpat-[A-Za-z0-9_\-]{20}", ("glpat-",)),
+    ("slack_token", "Slack Token", "High", r"xox[baprs]-[A-Za-z0-9\-]{10,72}", ("xox",)),
+    ("slack_webhook", "Slack Webhook URL", "Medium",
+     r"https://hooks\.slack\.com/services/T[A-Z0-9]+/B[A-Z0-9]+/[A-Za-z0-9]{20,}", ("hooks.slack.com",)),
+    ("stripe_secret", "Stripe Secret Key", "Critical", r"(?:sk|rk)_live_[0-9A-Za-z]{24,99}", ("_live_",)),
+    ("openai_key", "OpenAI API Key", "High", r"sk-(?:proj-)?[A-Za-z0-9_\-]{20,200}T3BlbkFJ[A-Za-z0-9_\-]{20,200}",
+     ("t3blbkfj",)),
+    ("sendgrid_key", "SendGrid API Key", "High", r"SG\.[A-Za-z0-9_\-]{22}\.[A-Za-z0-9_\-]{43}", ("sg.",)),
+    ("mailgun_key", "Mailgun API Key", "Medium", r"key-[0-9a-z]{32}(?![0-9a-z])", ("key-",)),
+    ("jwt", "JSON Web Token", "Medium", r"eyJ[A-Za-z0-9_\-]{10,}\.eyJ[A-Za-z0-9_\-]{10,}\.[A-Za-z0-9_\-]{10,}", ("eyj",)),
+    ("generic_secret", "Hardcoded Secret", "Medium",
+     r"(?i:(?:api[_\-]?key|client[_\-]?secret|secret[_\-]?key|access[_\-]?token|auth[_\-]?token|password|passwd)"
+     r"[\"']?\s*[:=]\s*[\"'][^\"'\s<>]{12,200}[\"'])", ("apikey", "api_key", "api-key", "secret", "token", "passw")),
+    ("credit_card", "Credit Card Number", "High",
+     r"(?<![\d-])(?:4\d{3}|5[1-5]\d{2}|2[2-7]\d{2}|3[47]\d{2}|6011|65\d{2})(?:[ -]?\d){9,15}(?![\d-])", DIGITS),
+    ("us_ssn", "US Social Security Number", "High",
+     r"(?<![\d-])(?!000|666|9\d\d)\d{3}-(?!00)\d{2}-(?!0000)\d{4}(?![\d-])", DIGITS),
+    ("email", "Email Address", "Low", r"[A-Za-z0-9._%+\-]{1,64}@[A-Za-z0-9\-]+(?:\.[A-Za-z0-9\-]+)*\.[A-Za-z]{2,24}", ("@",)),
+]
+# Any card number or SSN contains a run like this; it is the only regex pass over the whole text
+DIGIT_RUN_RE = re.compile(r"[0-9]{3}[0-9 -]{7,}[0-9]") # Explicit ranges compile to a faster charset than \d
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+TEXT_CONTENT_TYPES = ("text/", "json", "javascript", "ecmascript", "xml", "x-www-form-urlencoded", "graphql")
+ASSET_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".css", ".js")
+MAX_MATCH = 512 # Longest match the rules can produce; chunks overlap by this much
+# How far before its anchor a rule's match may start (default: the anchor starts the match)
+LOOKBACK = {"email": 64, "openai_key": 220, "private_key": 40, "gcp_service_account": 24,
+            "generic_secret": 8, "slack_webhook": 8, "stripe_secret": 2}
+
+
+def luhn_valid(digits: str) -> bool:
+    total, parity = 0, len(digits) % 2
+    for i, ch in enumerate(digits):
+        d = int(ch)
+        if i % 2 == parity:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def _valid_card(value: str) -> bool:
+    digits = re.sub(r"[ -]", "", value)
+    return 13 <= len(digits) <= 19 and len(set(digits)) > 1 and luhn_valid(digits)
+
+
+def _valid_email(value: str) -> bool:
+    # Retina asset names (logo@2x.png) look like addresses
+    return not value.lower().endswith(ASSET_EXTENSIONS)
+
+
+VALIDATORS = {"credit_card": _valid_card, "email": _valid_email}
+
+
+def is_text_content(content_type: str, sample: bytes = b"") -> bool:
+    """True for textual content types; without one, sniffs the first bytes for NULs."""
+    if content_type:
+        return any(t in content_type.lower() for t in TEXT_CONTENT_TYPES)
+    return b"\x00" not in sample[:1024]
+
+
+def redact(value: str) -> str:
+    return value if len(value) <= 8 else f"{value[:4]}...{value[-2:]} ({len(value)} chars)"
+
+
+class SensitiveDataScanner:
+    """Secrets/PII detection with every rule behind one shared prefilter.
+
+    A Python alternation of 20 regexes tries each alternative at every offset
+    (slower than running them one by one), so matching is staged instead: a
+    single pass per anchor literal with str.find over the ASCII-lowercased text,
+    plus one digit-run regex pass, yields candidate offsets; only there is the
+    owning rule's regex run. Validators then drop look-alikes (Luhn for card
+    numbers, asset names for emails). Streams are scanned in chunks that overlap
+    by MAX_MATCH characters, so memory stays at one chunk.
+    """
+
+    def __init__(self, rules=SENSITIVE_RULES, chunk_size: int = 1 << 20):
+        self.rules = {name: (label, severity, re.compile(pattern)) for name, label, severity, pattern, _ in rules}
+        self.anchors = {} # literal -> rules it can start
+        self.digit_rules = []
+        for name, _, _, _, anchors in rules:
+            if anchors == DIGITS:
+                self.digit_rules.append(name)
+            else:
+                for anchor in anchors:
+                    self.anchors.setdefault(anchor, []).append(name)
+        self.chunk_size = chunk_size
+
+    def _candidates(self, text: str):
+        """(rule, window start, window end, anchor offset) for every prefilter hit."""
+        lower = text.translate(ASCII_LOWER) # Same length as text, unlike str.lower()
+        size = len(text)
+        for anchor, names in self.anchors.items():
+            i = lower.find(anchor)
+            while i != -1:
+                for name in names:
+                    yield name, max(0, i - LOOKBACK.get(name, 0)), min(size, i + MAX_MATCH), i
+                i = lower.find(anchor, i + 1)
+        for run in DIGIT_RUN_RE.finditer(text):
+            for name in self.digit_rules:
+                yield name, run.start(), min(size, run.end() + 1), None
+
+    def _hits(self, text: str, end: int, base: int, resume: int) -> Iterator[Dict[str, Any]]:
+        matches = {}
+        for rule, window_start, window_end, anchor in self._candidates(text):
+            for match in self.rules[rule][2].finditer(text, window_start, window_end):
+                if anchor is not None:
+                    if match.start() > anchor:
+                        break
+                    if match.end() <= anchor:
+                        continue
+                matches.setdefault((match.start(), rule), match)
+        for (start, rule), match in sorted(matches.items()):
+            if start >= end:
+                break
+            if base + start < resume:
+                continue # Overlaps a match already reported (here or in the previous chunk)
+            value = match.group(0)
+            validator = VALIDATORS.get(rule)
+            if validator and not validator(value):
+                continue
+            label, severity, _ = self.rules[rule]
+            resume = base + match.end()
+            yield {"rule": rule, "label": label, "severity": severity, "value": value,
+                   "start": base + start, "end": base + match.end()}
+
+    def scan_stream(self, chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yields hits from consecutive text chunks, with absolute offsets."""
+        pending, base, resume = "", 0, 0
+        for chunk in chunks:
+            buffer = pending + chunk
+            end = max(0, len(buffer) - MAX_MATCH)
+            for hit in self._hits(buffer, end, base, resume):
+                resume = hit["end"]
+                yield hit
+            # Keep the overlap; anything starting there is rescanned with the next chunk
+            pending, base = buffer[end:], base + end
+        for hit in self._hits(pending, len(pending), base, resume):
+            yield hit
+
+    def scan_text(self, text: str) -> List[Dict[str, Any]]:
+        return list(self.scan_stream(text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)))
+
+    def scan_bytes(self, body: bytes, content_type: str = "") -> List[Dict[str, Any]]:
+        """Scans a response body, skipping binary content types."""
+        if not body or not is_text_content(content_type, body):
+            return []
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        chunks = (decoder.decode(body[i:i + self.chunk_size]) for i in range(0, len(body), self.chunk_size))
+        return list(self.scan_stream(chunks))
+
+    @staticmethod
+    def finding(hit: Dict[str, Any], source: str) -> Dict[str, Any]:
+        return {
+            "severity": hit["severity"],
+            "type": "Sensitive Data Exposure",
+            "details": f"{hit['label']} exposed in {source}: {redact(hit['value'])}",
+            "remediation": "Remove the value from client-facing content; rotate it if it is a credential.",
+            "fingerprint": hashlib.sha256(hit["value"].encode("utf-8")).hexdigest()[:16],
+        }
@@ -0,0 +1,150 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any
+from quantum_qe_core.skills.browser import BrowserManager
+from quantum_qe_core.skills.scanner import SecurityAuditor
+from quantum_qe_core.skills.crawler import scan_page, normalize_url, state_fingerprint
+from quantum_qe_core.tracing import span
+
+SESSION_STORAGE_JS = "() => JSON.stringify(Object.assign({}, sessionStorage))"
+
+
+class SnapshotAuditor:
+    """Audits the page states the Navigator reaches while it keeps going.
+
+    `snapshot()` is the Navigator's on_step hook: it captures the state right
+    after a step (URL, cookies and localStorage via storage_state, sessionStorage,
+    the response records captured for that URL) and schedules an audit of it.
+    Each audit runs in a fresh BrowserContext of the same browser, restored from
+    the snapshot, so the Navigator's page is never touched and later steps
+    cannot change what is audited. Equivalent states (same URL and DOM
+    structure) are audited once.
+
+    Audits during navigation are passive only: fuzzing forms with the
+    Navigator's live session could rotate CSRF tokens or end the session it is
+    still using. With `active` ("http" or "browser") the states that have forms
+    are fuzzed in `finish()`, once navigation is over.
+
+    Every snapshot gets its own SecurityAuditor; `finish()` merges their findings
+    in step order, so a finding is attributed to the first Navigator step whose
+    state exhibits it, independent of which audit finished first. Steps are
+    numbered as in the report (the step the Navigator's tool just logged), or by
+    the recorder's call index when there is no reporter. `cancel()`
+    stops outstanding audits when the session ends early.
+    """
+
+    def __init__(self, browser_manager: BrowserManager, reporter=None, concurrency: int = 2,
+                 active: str = None, corpus=None):
+        self.browser = browser_manager
+        self.reporter = reporter
+        self.active = active
+        self.corpus = corpus
+        self.snapshots = []
+        self._seen = set()
+        self._tasks = []
+        self._auditors = {} # snapshot id -> SecurityAuditor
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def snapshot(self, step: Dict[str, Any]):
+        """Captures the Navigator's current state and dispatches its audit."""
+        page = self.browser.page
+        if not page:
+            return
+        url = page.url
+        last = self.browser.last_snapshot
+        # last_snapshot is the DOM the step's tool just observed (dom_diff mode); fall back to the URL alone
+        key = state_fingerprint(url, last) if last and last.get("url") == url else normalize_url(url)
+        if key in self._seen or not url.startswith("http"):
+            return
+        self._seen.add(key)
+
+        with span("audit/snapshot", "scan"):
+            snapshot = {
+                "id": len(self.snapshots) + 1,
+                # The report step the Navigator's tool just logged; without a reporter, the recorder's step index
+                "step": self.reporter.step_count if self.reporter else step.get("index"),
+                "description": f"{step['tool']} {step['input']}",
+                "url": url,
+                "storage_state": await page.context.storage_state(),
+                "session_storage": await page.evaluate(SESSION_STORAGE_JS),
+                "responses": [dict(r) for r in await self.browser.get_responses_for(url)],
+                "has_form": False,
+                "findings": [],
+                "error": None,
+            }
+        self.snapshots.append(snapshot)
+        self._auditors[snapshot["id"]] = SecurityAuditor(self.corpus)
+        self._tasks.append(asyncio.create_task(self._audit(snapshot)))
+
+    @asynccontextmanager
+    async def _restored(self, snapshot: Dict[str, Any]):
+        """A worker BrowserManager on the snapshot's URL, in a new context restored from the snapshot."""
+        context = worker = None
+        try:
+            context = await self.browser.page.context.browser.new_context(storage_state=snapshot["storage_state"])
+            page = await context.new_page()
+            await page.add_init_script(
+                "(() => { const s = %s; for (const k in s) sessionStorage.setItem(k, s[k]); })()"
+                % snapshot["session_storage"])
+            worker = BrowserManager(headless=self.browser.headless, dom_diff=False, token_budget=None,
+                                    screenshot_store=self.browser.screenshot_store, background_passive=False)
+            worker.attach(page)
+            await page.goto(snapshot["url"], timeout=30000)
+            await worker.wait_for_settle(label="audit")
+            yield worker, await worker.dom_extractor.extract(page)
+        finally:
+            if worker:
+                await worker.close()
+            if context:
+                await context.close()
+
+    async def _audit(self, snapshot: Dict[str, Any], active: str = None):
+        auditor = self._auditors[snapshot["id"]]
+        phase = "fuzz" if active else "audit"
+        async with self._semaphore:
+            try:
+                with span(f"{phase}/state", "scan", step=snapshot["step"]):
+                    if not active:
+                        # Headers the Navigator saw for this URL, then whatever the audit's own load captures
+                        for record in snapshot["responses"]:
+                            auditor.passive.add(record)
+                    async with self._restored(snapshot) as (worker, dom):
+                        snapshot["has_form"] = snapshot["has_form"] or any(
+                            e["tag"] in ("form", "input", "textarea") for e in dom.get("elements", []))
+                        await scan_page(auditor, worker, snapshot["url"], dom, active=active)
+            except Exception as e:
+                snapshot["error"] = str(e)
+                print(f"[AUDIT] {phase.capitalize()} of step {snapshot['step']} ({snapshot['url']}) failed: {e}")
+            snapshot["findings"] = auditor.get_findings()
+
+    async def finish(self) -> List[Dict[str, Any]]:
+        """Waits for the outstanding audits, then fuzzes (with `active`) the states that have forms.
+
+        Returns the snapshots with deduplicated, attributed findings. Call it only
+        once navigation is over.
+        """
+        await asyncio.gather(*self._tasks)
+        if self.active:
+            self._tasks = [asyncio.create_task(self._audit(snapshot, self.active))
+                           for snapshot in self.snapshots if snapshot["has_form"] and not snapshot["error"]]
+            await asyncio.gather(*self._tasks)
+        seen = set()
+        for snapshot in self.snapshots:
+            attributed = []
+            for finding in snapshot["findings"]:
+                # Header findings' details change with counts; their fingerprint does not
+                key = (finding["type"], finding.get("fingerprint") or finding["details"])
+                if key not in seen:
+                    seen.add(key)
+                    attributed.append(dict(finding, navigator_step=snapshot["step"], url=snapshot["url"]))
+            snapshot["findings"] = attributed
+        return self.snapshots
+
+    async def cancel(self):
+        """Stops audits still running (e.g. the Navigator failed or the session timed out); closes their contexts."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def findings(self) -> List[Dict[str, Any]]:
+        return [finding for snapshot in self.snapshots for finding in snapshot["findings"]]
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import asyncio
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Numeric span args that the summary table totals per span name
+SUMMED_ARGS = ("input_tokens", "output_tokens", "bytes")
+
+
+def _lane() -> str:
+    """Name of the asyncio task (or thread) a span runs on; concurrent tasks get their own trace row."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task.get_name() if task else threading.current_thread().name
+
+
+class Tracer:
+    """Collects timed spans for one run.
+
+    Spans are plain dicts in a bounded deque, so tracing can stay on for long
+    runs. `export_chrome_trace` writes them as Chrome trace-event JSON (open in
+    chrome://tracing or ui.perfetto.dev); `summary` aggregates them per name.
+    """
+
+    def __init__(self, max_spans: int = 200000):
+        self.spans = deque(maxlen=max_spans)
+        self.origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "run", **args):
+        """Times the enclosed block. The yielded dict can be filled with args (tokens, bytes ...)."""
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self.add(name, cat, start, time.perf_counter(), args)
+
+    def add(self, name: str, cat: str, start: float, end: float, args: Dict[str, Any] = None, lane: str = None):
+        self.spans.append({"name": name, "cat": cat, "start": start - self.origin, "dur": end - start,
+                           "lane": lane or _lane(), "args": args or {}})
+
+    def traced(self, name: str, cat: str = "run", measure: Callable[[Any], Dict[str, Any]] = None):
+        """Decorator for coroutines; `measure(result)` may add args such as bytes returned."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            async def wrapper(*a, **kw):
+                with self.span(name, cat) as args:
+                    result = await fn(*a, **kw)
+                    if measure:
+                        args.update(measure(result))
+                    return result
+            return wrapper
+        return decorator
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per span name: count, total/avg/max seconds and summed token/byte args, slowest first."""
+        rows = {}
+        for span in list(self.spans):
+            row = rows.setdefault(span["name"], {"name": span["name"], "cat": span["cat"], "count": 0,
+                                                 "total": 0.0, "max": 0.0, "errors": 0})
+            row["count"] += 1
+            row["total"] += span["dur"]
+            row["max"] = max(row["max"], span["dur"])
+            row["errors"] += "error" in span["args"]
+            for key in SUMMED_ARGS:
+                if isinstance(span["args"].get(key), (int, float)):
+                    row[key] = row.get(key, 0) + span["args"][key]
+        for row in rows.values():
+            row["avg"] = row["total"] / row["count"]
+        return sorted(rows.values(), key=lambda r: r["total"], reverse=True)
+
+    def format_summary(self, limit: int = 30) -> str:
+        lines = [f"{'span':<34}{'count':>7}{'total s':>10}{'avg s':>9}{'max s':>9}{'tokens in/out':>17}{'bytes':>12}"]
+        for row in self.summary()[:limit]:
+            tokens = f"{row['input_tokens']}/{row['output_tokens']}" if "input_tokens" in row else "-"
+            lines.append(f"{row['name'][:33]:<34}{row['count']:>7}{row['total']:>10.2f}{row['avg']:>9.3f}"
+                         f"{row['max']:>9.3f}{tokens:>17}{row.get('bytes', '-'):>12}")
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str) -> str:
+        pid = os.getpid()
+        lanes = {}
+        events = []
+        for span in list(self.spans):
+            tid = lanes.setdefault(span["lane"], len(lanes) + 1)
+            events.append({"name": span["name"], "cat": span["cat"], "ph": "X", "pid": pid, "tid": tid,
+                           "ts": round(span["start"] * 1e6), "dur": round(span["dur"] * 1e6),
+                           "args": span["args"]})
+        for lane, tid in lanes.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": lane}})
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return path
+
+
+class TraceCallback(BaseCallbackHandler):
+    """LangChain callback that records one span per chat model call, with token usage."""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self._running = {} # run_id -> (start, lane, model)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model_name") or (serialized or {}).get("name", "llm")
+        self._running[run_id] = (time.perf_counter(), _lane(), model)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._running.pop(run_id, None)
+        if not started:
+            return
+        start, lane, model = started
+        args = {"model": model, "input_tokens": 0, "output_tokens": 0}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                args["input_tokens"] += usage.get("input_tokens", 0)
+                args["output_tokens"] += usage.get("output_tokens", 0)
+                if message is not None and message.response_metadata.get("qe_cache") == "hit":
+                    args["cache"] = "hit"
+        self.tracer.add("llm/" + ("cached" if args.get("cache") else "call"), "llm", start, time.perf_counter(), args, lane)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        started = self._running.pop(run_id, None)
+        if started:
+            start, lane, model = started
+            self.tracer.add("llm/call", "llm", start, time.perf_counter(), {"model": model, "error": type(error).__name__}, lane)
+
+
+TRACER = Tracer()
+TRACE_CALLBACK = TraceCallback(TRACER)
+span = TRACER.span
+traced = TRACER.traced
+
+
+def text_bytes(result) -> Dict[str, Any]:
+    """`measure` helper: size of a string result (or of a dict's "text") in UTF-8 bytes."""
+    if isinstance(result, dict):
+        result = result.get("text")
+    return {"bytes": len(result.encode("utf-8"))} if isinstance(result, str) else {}